@@ -0,0 +1,300 @@
+# Headless entry point of the game tools. It must not import pygame (directly
+# or through components.view / utils.graphics), so it starts fast without SDL
+import argparse, json, os, sys, time
+
+from components.grid import Grid as Grid
+from components.solver import Solver as Solver
+from utils import config, utils
+
+# Solutions validated at once, so streamed files use bounded memory
+VALIDATE_BATCH_SIZE = 1024
+
+
+def load_grids(args):
+    """Loads the grid configurations chosen by the command line arguments.
+    The configurations of a file are streamed, so a grid can be used before
+    the rest of the file is loaded.
+
+    Yields:
+        tuple[str, dict]: name and grid configuration of every chosen grid
+    """
+
+    if args.file:
+        for i, grid_config in enumerate(utils.iter_grid_configs(args.file)):
+            yield f"{args.file} #{i + 1}", grid_config
+        return
+
+    if args.random:
+        rows, cols, qpoints = args.random
+        yield "random", Grid.create_random_config(rows, cols, qpoints)
+        return
+
+    levels = utils.load_level_pack(os.path.join(config.DATA_DIR, "levels.json"))
+    chosen = args.level or range(1, len(levels) + 1)
+    for level in chosen:
+        if level < 1 or level > len(levels):
+            raise Exception(
+                f"Level not found, please choose a level between 1 and {len(levels)}"
+            )
+    for level in chosen:
+        yield f"level {level}", levels[level - 1]
+
+
+def print_grid(grid: Grid) -> None:
+    """Prints the colors of the grid cells."""
+
+    for row in grid.grid:
+        print(" ".join(f"{cell[0]:2}" for cell in row))
+    print()
+
+
+def solve(args) -> int:
+    """Solves the chosen grids and prints their solutions."""
+
+    all_solved = True
+    for name, grid_config in load_grids(args):
+        grid = Grid.from_config(grid_config)
+        start = time.perf_counter()
+        solved = Solver(grid).solve(args.debug)
+        elapsed = time.perf_counter() - start
+
+        all_solved &= solved
+        print(
+            f"{name}: {'solved' if solved else 'no solution found'} in {elapsed:.3f}s"
+        )
+        if solved:
+            print_grid(grid)
+    return 0 if all_solved else 1
+
+
+def bench(args) -> int:
+    """Measures the average solve time of the chosen grids."""
+
+    total_time = 0.0
+    for name, grid_config in load_grids(args):
+        grid = Grid.from_config(grid_config)
+        times = []
+        for _ in range(args.runs):
+            grid.restart()
+            solver = Solver(grid)
+            start = time.perf_counter()
+            solved = solver.solve()
+            times.append(time.perf_counter() - start)
+
+        average = sum(times) / len(times)
+        total_time += average
+        stats = solver.tried_paths_stats()
+        print(
+            f"{name} ({grid.rows}x{grid.cols}, {grid.qpoints} points):",
+            f"{average * 1000:.2f} ms,",
+            f"tried paths peak {stats['peak']}, {stats['evictions']} evicted",
+            "" if solved else "(no solution found)",
+        )
+    print(f"Total: {total_time * 1000:.2f} ms")
+    return 0
+
+
+def validate_batch(names: list, boards: list, points: list) -> int:
+    """Validates the solutions of a batch of boards of the same size and
+    prints the invalid ones.
+
+    Returns:
+        int: number of invalid solutions
+    """
+
+    import numpy as np
+    from components import validator
+
+    valid = validator.validate_solution(np.stack(boards), np.stack(points))
+    for name in np.asarray(names)[~valid]:
+        print(f"{name}: invalid solution")
+    return int((~valid).sum())
+
+
+def validate(args) -> int:
+    """Validates the grid configurations of a file and, optionally, the
+    solver's solutions of them."""
+
+    # NumPy is only needed to validate solutions
+    if args.solve:
+        from components import validator
+
+    # Boards of the same size are validated in batches
+    batches = {}
+    count = unsolved = invalid = 0
+    try:
+        for name, grid_config in load_grids(args):
+            count += 1
+            if not args.solve:
+                continue
+
+            grid = Grid.from_config(grid_config)
+            if not Solver(grid).solve():
+                unsolved += 1
+                continue
+            batch = batches.setdefault(
+                (grid.rows, grid.cols, grid.qpoints), ([], [], [])
+            )
+            batch[0].append(name)
+            batch[1].append(validator.grid_to_array(grid))
+            batch[2].append(validator.points_to_array(grid.points))
+            if len(batch[0]) >= VALIDATE_BATCH_SIZE:
+                invalid += validate_batch(*batch)
+                del batches[(grid.rows, grid.cols, grid.qpoints)]
+    except Exception as e:
+        print(f"Invalid: {e}")
+        return 1
+    print(f"{count} valid grid configurations")
+    if not args.solve:
+        return 0
+
+    for batch in batches.values():
+        invalid += validate_batch(*batch)
+
+    print(f"{unsolved} without solution, {invalid} invalid solutions")
+    return 0 if invalid == 0 else 1
+
+
+def convert(args) -> int:
+    """Converts a grid configuration file to a binary level file, or a binary
+    level file back to JSON."""
+
+    if utils.is_level_file(args.input):
+        levels = utils.load_level_pack(args.input)
+        with open(args.output, "w") as output:
+            output.write("[\n")
+            for i, grid_config in enumerate(levels):
+                output.write(",\n" if i > 0 else "")
+                output.write(json.dumps(grid_config))
+            output.write("\n]\n")
+        print(f"Wrote {len(levels)} grid configurations to {args.output}")
+        return 0
+
+    # The file is streamed twice, first to find the size of the records
+    shape = utils.level_file_shape(utils.iter_grid_configs(args.input))
+
+    def grid_configs():
+        for grid_config in utils.iter_grid_configs(args.input):
+            if args.solve:
+                grid = Grid.from_config(grid_config)
+                if Solver(grid).solve():
+                    grid_config["paths"] = grid._paths[1:]
+            yield grid_config
+
+    count = utils.save_level_file(args.output, grid_configs(), shape, args.solve)
+    print(
+        f"Wrote {count} grid configurations to {args.output}",
+        f"({os.path.getsize(args.input)} -> {os.path.getsize(args.output)} bytes)",
+    )
+    return 0
+
+
+def serve(args) -> int:
+    """Runs the solver service over stdin and stdout, or a Unix socket."""
+
+    # The worker processes are only started for the service
+    from components.service import SolverService
+
+    service = SolverService(args.workers, args.timeout)
+    try:
+        if args.socket:
+            print(f"Listening on {args.socket}", file=sys.stderr)
+            service.serve_socket(args.socket)
+        else:
+
+            def write(line):
+                sys.stdout.write(line)
+                sys.stdout.flush()
+
+            service.serve(sys.stdin, write)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+def positive_int(value: str) -> int:
+    """Parses a command line argument that must be an integer of at least 1."""
+
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be an integer of at least 1: {value}")
+    return number
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(description="Flow headless tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_grid_arguments(command):
+        source = command.add_mutually_exclusive_group()
+        source.add_argument("-l", "--level", type=int, nargs="+", help="levels to use")
+        source.add_argument("-f", "--file", help="grid configuration file to use")
+        source.add_argument(
+            "-r",
+            "--random",
+            type=int,
+            nargs=3,
+            metavar=("ROWS", "COLS", "QPOINTS"),
+            help="random grid to use",
+        )
+
+    command = commands.add_parser("solve", help="solve grids")
+    add_grid_arguments(command)
+    command.add_argument("-d", "--debug", action="store_true", help="show solver steps")
+    command.set_defaults(run=solve)
+
+    command = commands.add_parser("bench", help="measure solve times")
+    add_grid_arguments(command)
+    command.add_argument(
+        "-n", "--runs", type=positive_int, default=3, help="runs per grid"
+    )
+    command.set_defaults(run=bench)
+
+    command = commands.add_parser("validate", help="validate grid configurations")
+    add_grid_arguments(command)
+    command.add_argument(
+        "-s", "--solve", action="store_true", help="also validate the solutions"
+    )
+    command.set_defaults(run=validate)
+
+    command = commands.add_parser(
+        "convert", help="convert grid configurations to a binary level file"
+    )
+    command.add_argument("input", help="JSON, JSON-lines or binary level file")
+    command.add_argument("output", help="binary level file, or JSON file")
+    command.add_argument(
+        "-s", "--solve", action="store_true", help="also store the solutions"
+    )
+    command.set_defaults(run=convert)
+
+    command = commands.add_parser(
+        "serve", help="solve JSON-lines grid configurations with a worker pool"
+    )
+    command.add_argument(
+        "-j", "--workers", type=int, default=None, help="worker processes"
+    )
+    command.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        default=config.SERVICE_TIMEOUT,
+        help="seconds a request can take to solve",
+    )
+    command.add_argument("--socket", help="Unix socket to listen on")
+    command.set_defaults(run=serve)
+
+    args = parser.parse_args(argv[1:])
+    try:
+        return args.run(args)
+    except Exception as e:
+        print(e)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -2,25 +2,50 @@ import pygame as pg
 
 from . import model
 from .eventmanager import *
+from .layout import BoardLayout
 from utils import config
 
+# Event posted by the hint engine's thread when a hint solve ends
+HINT_SOLVED = pg.event.custom_type()
+
+
+def post_hint_solved() -> None:
+    """Wakes the game loop to post a HintReadyEvent. It can be called from
+    any thread (see HintEngine)."""
+
+    pg.event.post(pg.event.Event(HINT_SOLVED))
+
 
 class GameController(Listener):
     """
     Controller that handles user input.
     """
 
-    def __init__(self, event_manager: EventManager, model: model.GameEngine) -> None:
+    def __init__(
+        self,
+        event_manager: EventManager,
+        model: model.GameEngine,
+        layout: BoardLayout = None,
+    ) -> None:
         """
         Args:
             event_manager (EventManager): to post messages to
             the event queue.
             model (GameEngine): the game engine.
+            layout (BoardLayout, optional): the position of the board on the
+            screen, shared with the view. Defaults to None, the layout of
+            the grid size.
+
+        Attributes:
+            hovered_tile (tuple): the (row, col) of the last tile that
+            was pressed or hovered.
         """
 
         self.event_manager = event_manager
-        self.event_manager.register_listener(self)
+        self.event_manager.subscribe(TickEvent, self.on_tick)
         self.model = model
+        self.layout = layout or BoardLayout(model.grid.rows, model.grid.cols)
+        self.hovered_tile = None
 
     def calculate_tile_pos(self, pos: tuple) -> tuple:
         """Calculate position of the tile that was interacted with.
@@ -32,25 +57,82 @@ class GameController(Listener):
             tuple: the (row, col) of the tile.
         """
 
-        row = (pos[1] - config.MARGIN - config.FONT_SIZE * 2) // config.TILE_SIZE
-        col = (pos[0] - config.MARGIN) // config.TILE_SIZE
-        return (row, col)
-
-    def notify(self, event: Event) -> None:
-        if isinstance(event, TickEvent):
-            for event in pg.event.get():
-                if event.type == pg.QUIT:
-                    self.event_manager.post(QuitEvent())
-                elif event.type == pg.MOUSEBUTTONDOWN:
-                    self.event_manager.post(
-                        TilePressedEvent(self.calculate_tile_pos(event.pos))
-                    )
-                elif event.type == pg.MOUSEMOTION:
-                    self.event_manager.post(
-                        TileHoveredEvent(self.calculate_tile_pos(event.pos))
+        return self.layout.tile_at(pos)
+
+    def calculate_tiles_between(self, start: tuple, end: tuple) -> list:
+        """Calculate the tiles crossed by the line from a tile to another,
+        so that every tile is adjacent to the previous one.
+
+        Args:
+            start (tuple): the (row, col) of the first tile.
+            end (tuple): the (row, col) of the last tile.
+
+        Returns:
+            list: the (row, col) of the tiles after start up to end.
+        """
+
+        row, col = start
+        n_rows, n_cols = abs(end[0] - row), abs(end[1] - col)
+        step_row = 1 if end[0] > row else -1
+        step_col = 1 if end[1] > col else -1
+
+        tiles = []
+        i, j = 0, 0
+        while i < n_rows or j < n_cols:
+            # Step along the axis whose next tile border is crossed first
+            # by the line, that is (0.5 + j) / n_cols < (0.5 + i) / n_rows
+            if (1 + 2 * j) * n_rows < (1 + 2 * i) * n_cols:
+                col += step_col
+                j += 1
+            else:
+                row += step_row
+                i += 1
+            tiles.append((row, col))
+        return tiles
+
+    def on_tick(self, event: TickEvent) -> None:
+        if config.IDLE_WAIT and self.model.is_idle():
+            # Nothing changes until there is input, so wait for it
+            # instead of ticking at full rate
+            events = [pg.event.wait(config.IDLE_TIMEOUT)] + pg.event.get()
+        else:
+            events = pg.event.get()
+        for event in events:
+            if event.type == pg.QUIT:
+                self.event_manager.post(QuitEvent())
+            elif event.type == pg.MOUSEBUTTONDOWN:
+                self.hovered_tile = self.calculate_tile_pos(event.pos)
+                self.event_manager.post(TilePressedEvent(self.hovered_tile))
+            elif event.type == pg.MOUSEMOTION:
+                tile = self.calculate_tile_pos(event.pos)
+                # Motion inside the same tile doesn't change anything
+                if tile == self.hovered_tile:
+                    continue
+                # A fast drag may skip tiles between two motion events,
+                # so the path is continued through the skipped tiles
+                if self.hovered_tile is not None and not self.model.is_idle():
+                    tiles = self.calculate_tiles_between(self.hovered_tile, tile)
+                else:
+                    tiles = [tile]
+                self.hovered_tile = tile
+                for tile in tiles:
+                    self.event_manager.post(TileHoveredEvent(tile))
+            elif event.type == pg.MOUSEBUTTONUP:
+                self.event_manager.post(TileReleasedEvent())
+            elif event.type == pg.MOUSEWHEEL and self.layout.is_scrollable():
+                # A wheel step scrolls the board by a tile
+                self.event_manager.post(
+                    ScrollEvent(
+                        event.x * self.layout.tile_size,
+                        -event.y * self.layout.tile_size,
                     )
-                elif event.type == pg.MOUSEBUTTONUP:
-                    self.event_manager.post(TileReleasedEvent())
-                elif event.type == pg.KEYDOWN:
-                    if event.key == pg.K_r:
-                        self.event_manager.post(RestartEvent())
+                )
+            elif event.type == HINT_SOLVED:
+                self.event_manager.post(HintReadyEvent())
+            elif event.type == pg.KEYDOWN:
+                if event.key == pg.K_r:
+                    self.event_manager.post(RestartEvent())
+                elif event.key == pg.K_F3:
+                    self.event_manager.post(ProfilerEvent())
+                elif event.key == pg.K_h:
+                    self.event_manager.post(HintEvent())
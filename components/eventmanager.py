@@ -4,8 +4,8 @@ class Event:
     by the event manager.
     """
 
-    def __init__(self, name) -> None:
-        self.name = name
+    __slots__ = ()
+    name = "event"
 
     def __str__(self) -> str:
         return f"Event: {self.name}"
@@ -14,31 +14,97 @@ class Event:
         return self.__str__()
 
 
-class QuitEvent(Event):
+class ReusableEvent(Event):
+    """
+    Superclass for events without payload. A single instance
+    of each of these events is created and reused every time
+    the event is posted.
+    """
+
+    __slots__ = ()
+    _instances = {}
+
+    def __new__(cls):
+        instance = ReusableEvent._instances.get(cls)
+        if instance is None:
+            instance = super().__new__(cls)
+            ReusableEvent._instances[cls] = instance
+        return instance
+
+
+class QuitEvent(ReusableEvent):
     """
     Quit the game event.
     """
 
-    def __init__(self) -> None:
-        super().__init__("quit")
+    __slots__ = ()
+    name = "quit"
 
 
-class TickEvent(Event):
+class TickEvent(ReusableEvent):
     """
     Tick event.
     """
 
-    def __init__(self) -> None:
-        super().__init__("tick")
+    __slots__ = ()
+    name = "tick"
 
 
-class RestartEvent(Event):
+class RestartEvent(ReusableEvent):
     """
     Restart the state event. Triggered by pressing the R key.
     """
 
-    def __init__(self) -> None:
-        super().__init__("restart")
+    __slots__ = ()
+    name = "restart"
+
+
+class ProfilerEvent(ReusableEvent):
+    """
+    Toggle the frame profiler overlay event. Triggered by pressing the F3 key.
+    """
+
+    __slots__ = ()
+    name = "profiler"
+
+
+class HintEvent(ReusableEvent):
+    """
+    Show a hint event. Triggered by pressing the H key.
+    """
+
+    __slots__ = ()
+    name = "hint"
+
+
+class HintReadyEvent(ReusableEvent):
+    """
+    A hint solve ended event. Posted by the game loop when the
+    hint engine's background thread ends a solve.
+    """
+
+    __slots__ = ()
+    name = "hint_ready"
+
+
+class ScrollEvent(Event):
+    """
+    Scroll the board event. Triggered by the mouse wheel
+    when the board doesn't fit the window.
+    """
+
+    __slots__ = ("dx", "dy")
+    name = "scroll"
+
+    def __init__(self, dx: int, dy: int) -> None:
+        self.dx = dx
+        self.dy = dy
+
+    def __str__(self) -> str:
+        return f"Event: {self.name} - {(self.dx, self.dy)}"
+
+    def __repr__(self) -> str:
+        return self.__str__()
 
 
 class TileEvent(Event):
@@ -46,8 +112,10 @@ class TileEvent(Event):
     Superclass to represent interaction with a tile.
     """
 
+    __slots__ = ("pos",)
+    name = "tile"
+
     def __init__(self, pos: tuple[int, int]) -> None:
-        super().__init__("tile")
         self.pos = pos
 
     def __str__(self) -> str:
@@ -62,9 +130,8 @@ class TilePressedEvent(TileEvent):
     Tile pressed (mouse down) event.
     """
 
-    def __init__(self, pos: tuple[int, int]) -> None:
-        super().__init__(pos)
-        self.name = "tile_pressed"
+    __slots__ = ()
+    name = "tile_pressed"
 
 
 class TileHoveredEvent(TileEvent):
@@ -72,29 +139,30 @@ class TileHoveredEvent(TileEvent):
     Tile hovered (mouse motion) event.
     """
 
-    def __init__(self, pos: tuple[int, int]) -> None:
-        super().__init__(pos)
-        self.name = "tile_hovered"
+    __slots__ = ()
+    name = "tile_hovered"
 
 
-class TileReleasedEvent(TileEvent):
+class TileReleasedEvent(ReusableEvent, TileEvent):
     """
     Tile released (mouse up) event.
     """
 
+    __slots__ = ()
+    name = "tile_released"
+
     def __init__(self) -> None:
         super().__init__(None)
-        self.name = "tile_released"
 
 
-class InitEvent(Event):
+class InitEvent(ReusableEvent):
     """
     Initialize event to tell listeners to initialize
     themselves.
     """
 
-    def __init__(self) -> None:
-        super().__init__("init")
+    __slots__ = ()
+    name = "init"
 
 
 class Listener:
@@ -116,10 +184,35 @@ class Listener:
 class EventManager:
     """
     Coordinates communication between the model, view, and controller.
+
+    Handlers subscribe to an event type and are only called for events
+    of that type (or of its subclasses). Listeners are handlers of every
+    event through their notify method.
     """
 
     def __init__(self):
         self.listeners = {}
+        # (event type, handler) in subscription order
+        self._handlers = []
+        # Handlers to call by event class, built on the first post of a class
+        self._dispatch = {}
+
+    def subscribe(self, event_type: type, handler) -> None:
+        """
+        Subscribe a handler to be called with the posted events
+        of the given type, including its subclasses.
+        """
+
+        self._handlers.append((event_type, handler))
+        self._dispatch.clear()
+
+    def unsubscribe(self, event_type: type, handler) -> None:
+        """
+        Unsubscribe a handler from the given event type.
+        """
+
+        self._handlers.remove((event_type, handler))
+        self._dispatch.clear()
 
     def register_listener(self, listener: Listener) -> None:
         """
@@ -127,6 +220,7 @@ class EventManager:
         """
 
         self.listeners[listener] = 1
+        self.subscribe(Event, listener.notify)
 
     def unregister_listener(self, listener: Listener) -> None:
         """
@@ -134,11 +228,29 @@ class EventManager:
         """
 
         del self.listeners[listener]
+        self.unsubscribe(Event, listener.notify)
+
+    def _build_dispatch(self, event_class: type) -> tuple:
+        """
+        Build the handlers to call for an event class. They are the
+        handlers of any class in the MRO of the event class, in
+        subscription order.
+        """
+
+        mro = set(event_class.__mro__)
+        handlers = tuple(
+            handler for event_type, handler in self._handlers if event_type in mro
+        )
+        self._dispatch[event_class] = handlers
+        return handlers
 
     def post(self, event: Event) -> None:
         """
-        Post an event to all listeners.
+        Post an event to the handlers of its type.
         """
 
-        for listener in self.listeners:
-            listener.notify(event)
+        handlers = self._dispatch.get(event.__class__)
+        if handlers is None:
+            handlers = self._build_dispatch(event.__class__)
+        for handler in handlers:
+            handler(event)
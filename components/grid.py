@@ -3,6 +3,12 @@ import random
 
 from utils import config
 
+# Direction codes of the tile states, indexed by the (row, col) offset
+# between two adjacent cells: 1: up, 2: right, 3: down, 4: left
+DIRECTIONS = {(-1, 0): 1, (0, 1): 2, (1, 0): 3, (0, -1): 4}
+# Opposite of each direction code (0 stays 0)
+OPPOSITE = (0, 3, 4, 1, 2)
+
 
 class Grid:
     """Represents the grid of a game. It is a rows * size matrix of tuples,
@@ -127,6 +133,10 @@ class Grid:
 
         self.grid = [[(0, 0, 0) for _ in range(self.cols)] for _ in range(self.rows)]
         self._initialize_grid()
+        # Every cell changes on restart
+        self._changed = {
+            (row, col) for row in range(self.rows) for col in range(self.cols)
+        }
 
         self._paths = [[]] * (self.qpoints + 1)
         self._is_pathing = False
@@ -227,6 +237,7 @@ class Grid:
                 self.grid[r][c] = (0, 0, 0)
             else:
                 self.grid[r][c] = (self._current_path, 0, 0)
+            self._changed.add((r, c))
 
     def _restart_path_until_cell(self, row: int, col: int) -> None:
         """Restart the current path until it reaches the given cell
@@ -243,6 +254,7 @@ class Grid:
                 self.grid[r][c] = (0, 0, 0)
             else:
                 self.grid[r][c] = (self._current_path, 0, 0)
+            self._changed.add((r, c))
 
     def start_path(self, row: int = None, col: int = None) -> None:
         """Starts a path from the given cell and tracks moves.
@@ -283,6 +295,16 @@ class Grid:
             # Update the state of the cell so that it ends the current path
             pos = self._position_of((row, col), self._paths[self._current_path][-2])
             self.grid[row][col] = (self._current_path, pos, 5)
+            self._changed.add((row, col))
+
+    def is_pathing(self) -> bool:
+        """Checks if there is a path being drawn (started and not ended).
+
+        Returns:
+            bool: True if a path is being drawn, False otherwise
+        """
+
+        return self._is_pathing
 
     def end_path(self) -> None:
         """Ends the current path."""
@@ -309,6 +331,8 @@ class Grid:
             self.grid[row][col] = (self._current_path, pos, 0)
         else:
             self.grid[row][col] = (self._current_path, pos, 5)
+        self._changed.add((r, c))
+        self._changed.add((row, col))
         # Add the new cell to the path
         self._paths[self._current_path] += [(row, col)]
 
@@ -362,6 +386,7 @@ class Grid:
                     self.grid[r][c] = (0, 0, 0)
                 else:
                     self.grid[r][c] = (self._current_path, 0, 0)
+                self._changed.add((r, c))
                 # If the new last cell is a point, mark it as no path
                 if len(self._paths[self._current_path]) == 1:
                     r, c = self._paths[self._current_path][0]
@@ -371,6 +396,7 @@ class Grid:
                     r, c = self._paths[self._current_path][-1]
                     pos = self._position_of((r, c), self._paths[self._current_path][-2])
                     self.grid[r][c] = (self._current_path, pos, 5)
+                self._changed.add((r, c))
             # If the last cell in path is a point, do nothing
             elif self._cell_is_point(*self._paths[self._current_path][-1]):
                 return
@@ -416,3 +442,88 @@ class Grid:
 
         self._current_path = current_path + 1
         self._restart_path_until_size()
+
+    def pop_changed_cells(self) -> set[tuple[int, int]]:
+        """Returns the cells whose state changed since the last call, and
+        stops tracking them.
+
+        Returns:
+            set[tuple[int, int]]: (row, col) of the changed cells
+        """
+
+        changed = self._changed
+        self._changed = set()
+        return changed
+
+    @staticmethod
+    def path_directions(path: list[tuple[int, int]]) -> list[int]:
+        """Calculates the direction sequence of a path. The i-th direction is
+        the position of the (i + 1)-th cell relative to the i-th cell.
+
+        Args:
+            path (list[tuple[int, int]]): list of adjacent cells that form the path
+
+        Returns:
+            list[int]: directions expressed as 1: up, 2: right, 3: down, 4: left
+        """
+
+        return [
+            DIRECTIONS[(row2 - row1, col2 - col1)]
+            for (row1, col1), (row2, col2) in zip(path, path[1:])
+        ]
+
+    def apply_path(
+        self, point: int, path: list[tuple[int, int]], directions: list[int] = None
+    ) -> None:
+        """Writes a trusted path to the grid in a single pass. Unlike add_path,
+        it doesn't validate the path nor track moves, so it must only be used
+        with paths that are known to be valid (e.g. found by the solver) on a
+        point-pair without path. The resulting grid is the same as add_path's.
+
+        Args:
+            point (int): index of the point-pair of the path
+            path (list[tuple[int, int]]): list of cells that form the path,
+                starting at one of the points of the point-pair
+            directions (list[int], optional): precomputed direction sequence
+                of the path (see path_directions). Defaults to None.
+        """
+
+        if directions is None:
+            directions = self.path_directions(path)
+
+        color = point + 1
+        grid = self.grid
+        last_pos = 0
+        for (row, col), pos in zip(path, directions):
+            grid[row][col] = (color, last_pos, pos)
+            last_pos = OPPOSITE[pos]
+
+        # The last cell ends the path, either on the other point or midway
+        row, col = path[-1]
+        if self._cell_is_point(row, col):
+            grid[row][col] = (color, last_pos, 0)
+        else:
+            grid[row][col] = (color, last_pos, 5)
+
+        self._paths[color] = list(path)
+        self._changed.update(path)
+
+    def clear_path(self, point: int) -> None:
+        """Removes a path from the grid in a single pass. Unlike remove_path,
+        it doesn't change the current path.
+
+        Args:
+            point (int): index of the point-pair of the path to remove
+        """
+
+        color = point + 1
+        grid = self.grid
+        for row, col in self._paths[color]:
+            # Mark the cells as empty, except the points
+            if self._cell_is_point(row, col):
+                grid[row][col] = (color, 0, 0)
+            else:
+                grid[row][col] = (0, 0, 0)
+
+        self._changed.update(self._paths[color])
+        self._paths[color] = []
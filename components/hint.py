@@ -0,0 +1,308 @@
+import threading
+from collections import OrderedDict
+
+from .eventmanager import *
+from .grid import Grid
+from .solver import Solver
+from . import model
+from utils import config
+
+# Key of the solution that keeps no path of the player
+FREE = frozenset()
+
+
+class HintEngine(Listener):
+    """
+    Gives hints from the current state of the game: a hint draws the path
+    of a point-pair that the player hasn't drawn as in the solution. The
+    player's complete paths are kept by the solution when possible, and
+    freed one at a time when they can't be kept.
+
+    The grid is solved by a background thread, so a hint never blocks the
+    game loop. The solution without the player's paths is solved as soon
+    as the game starts, and the recent solutions are kept, so most hints are
+    given at once. Otherwise the hint is given when the thread posts that its
+    solution is ready (see HintReadyEvent).
+    """
+
+    def __init__(
+        self,
+        event_manager: EventManager,
+        model: model.GameEngine,
+        timeout: float = config.HINT_TIMEOUT,
+        on_solved=None,
+        max_size: int = config.HINT_CACHE_SIZE,
+    ) -> None:
+        """
+        Args:
+            event_manager (EventManager): to subscribe to the events.
+            model (GameEngine): the game engine whose grid gets the hints.
+            timeout (float, optional): seconds the solver can take to find a
+            solution. Defaults to HINT_TIMEOUT.
+            on_solved (callable, optional): called from the background thread
+            when a solve ends, to get a HintReadyEvent posted by the game
+            loop (e.g. by posting a pygame event). Defaults to None.
+            max_size (int, optional): maximum number of solutions kept, besides
+            the solution without the player's paths. Defaults to HINT_CACHE_SIZE.
+
+        Attributes:
+            solution (list): path of every point-pair of the last solution
+            used, or None if there is none yet
+            solving (bool): whether the last hint waits for a background solve
+        """
+
+        self.event_manager = event_manager
+        self.event_manager.subscribe(InitEvent, self.on_init)
+        self.event_manager.subscribe(QuitEvent, self.on_quit)
+        self.event_manager.subscribe(HintEvent, self.on_hint)
+        self.event_manager.subscribe(HintReadyEvent, self.on_hint_ready)
+        self.model = model
+        self.timeout = timeout
+        self.on_solved = on_solved
+        self.max_size = max_size
+        self.solution = None
+        self.solving = False
+
+        # Solutions by the paths they keep (see _key), None if there is none.
+        # The least recently used are evicted when there are too many
+        self._solutions = OrderedDict()
+        # (key, paths to keep by point-pair index) of the next solve, and
+        # the key of the solve in progress
+        self._pending = None
+        self._solving_key = None
+        # Whether the player asked for a hint that isn't given yet
+        self._wanted = False
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def on_init(self, event: InitEvent) -> None:
+        # The first hints need the solution without the player's paths
+        self.request({})
+
+    def on_quit(self, event: QuitEvent) -> None:
+        self.close()
+
+    def on_hint(self, event: HintEvent) -> None:
+        # Hints aren't given while the player draws a path
+        if self.model.grid.is_pathing():
+            return
+
+        self._wanted = True
+        self.give_hint()
+
+    def on_hint_ready(self, event: HintReadyEvent) -> None:
+        if self._wanted and not self.model.grid.is_pathing():
+            self.give_hint()
+
+    def close(self) -> None:
+        """Stops the background thread. A solve in progress is abandoned."""
+
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+    def request(self, fixed: dict) -> None:
+        """Requests the background thread to solve the grid keeping some paths,
+        unless that solve is known or in progress. A solve that wasn't started
+        yet is replaced.
+
+        Args:
+            fixed (dict): the paths to keep, by point-pair index
+        """
+
+        # The thread gets its own copy of the paths, which the player may
+        # change while they are solved
+        fixed = {point: list(path) for point, path in fixed.items()}
+        key = self._key(fixed)
+        with self._condition:
+            if key not in self._solutions and key != self._solving_key:
+                self._pending = (key, fixed)
+                self._condition.notify()
+
+    def give_hint(self) -> None:
+        """Draws the next hint if its solution is known. Otherwise the hint is
+        given once the background thread solves the grid."""
+
+        self.solving = False
+        hint = self.next_hint()
+        if self.solving:
+            return
+
+        self._wanted = False
+        if hint is None:
+            print("No hint available")
+            return
+        self.apply_hint(*hint)
+
+    def complete_paths(self) -> dict:
+        """Finds the paths of the player that connect their point-pair.
+
+        Returns:
+            dict: copies of the complete paths, by point-pair index
+        """
+
+        grid = self.model.grid
+        paths = {}
+        for point, pair in enumerate(grid.points):
+            path = grid._paths[point + 1]
+            if len(path) > 1 and {path[0], path[-1]} == set(pair):
+                paths[point] = list(path)
+        return paths
+
+    def solve(self, fixed: dict) -> list | None:
+        """Solves the grid keeping some paths.
+
+        Args:
+            fixed (dict): the paths to keep, by point-pair index
+
+        Returns:
+            list | None: path of every point-pair of the solution, or None if
+            the solver couldn't find one in time
+        """
+
+        grid = self.model.grid
+        solved_grid = Grid(grid.rows, grid.cols, grid.qpoints, grid.points)
+        for point, path in fixed.items():
+            solved_grid.apply_path(point, path)
+
+        if not Solver(solved_grid).solve(timeout=self.timeout, fixed=tuple(fixed)):
+            return None
+        return [list(solved_grid._paths[point + 1]) for point in range(grid.qpoints)]
+
+    def find_solution(self) -> list | None:
+        """Finds a known solution that keeps as many complete paths of the
+        player as possible. The paths that the solution without the player's
+        paths doesn't have are freed one at a time, until a solution keeps
+        the rest. A solve that isn't known yet is requested.
+
+        Returns:
+            list | None: path of every point-pair of the solution, or None if
+            there is none or it isn't known yet
+        """
+
+        paths = self.complete_paths()
+        if self.solution is not None and self._agrees(self.solution, paths):
+            return self.solution
+
+        _, free = self._cached(FREE)
+        fixed = dict(paths)
+        while True:
+            # The paths that the solution without the player's paths has
+            # can all be kept
+            if free is not None and self._agrees(free, fixed):
+                self.solution = free
+                return free
+
+            known, solution = self._cached(self._key(fixed))
+            if not known:
+                self.solving = True
+                self.request(fixed)
+                return None
+            if solution is not None:
+                self.solution = solution
+                return solution
+            if not fixed:
+                return None
+
+            # Free a path that the solution without the player's paths
+            # doesn't have, or any path if there is no such solution
+            del fixed[
+                next(
+                    point
+                    for point, path in fixed.items()
+                    if free is None or not self._agrees(free, {point: path})
+                )
+            ]
+
+    def next_hint(self) -> tuple[int, list] | None:
+        """Finds the next hint: the first point-pair whose path isn't the
+        path of the solution.
+
+        Returns:
+            tuple[int, list] | None: the point-pair index and its path in the
+            solution, or None if the solution isn't known or the grid is solved
+        """
+
+        solution = self.find_solution()
+        if solution is None:
+            return None
+
+        for point, path in enumerate(solution):
+            current = self.model.grid._paths[point + 1]
+            if current != path and current != path[::-1]:
+                return point, path
+        return None
+
+    def apply_hint(self, point: int, path: list) -> None:
+        """Draws the path of a hint, removing the paths in its way.
+
+        Args:
+            point (int): the point-pair index of the hint
+            path (list): the path of the hint
+        """
+
+        grid = self.model.grid
+        cells = set(path)
+        for other in range(grid.qpoints):
+            if other != point and not cells.isdisjoint(grid._paths[other + 1]):
+                grid.clear_path(other)
+        grid.clear_path(point)
+        grid.apply_path(point, path)
+
+    @staticmethod
+    def _key(fixed: dict) -> frozenset:
+        """Key of the solution that keeps some paths."""
+
+        return frozenset((point, tuple(path)) for point, path in fixed.items())
+
+    @staticmethod
+    def _agrees(solution: list, paths: dict) -> bool:
+        """Checks if a solution has some paths, in either direction."""
+
+        return all(
+            path == solution[point] or path[::-1] == solution[point]
+            for point, path in paths.items()
+        )
+
+    def _cached(self, key: frozenset) -> tuple[bool, list | None]:
+        """Finds a known solution.
+
+        Returns:
+            tuple[bool, list | None]: whether the solve is known and its
+            solution, None if there is none
+        """
+
+        with self._condition:
+            if key not in self._solutions:
+                return False, None
+            self._solutions.move_to_end(key)
+            return True, self._solutions[key]
+
+    def _work(self) -> None:
+        """Solves the requested grids until the engine is closed."""
+
+        while True:
+            with self._condition:
+                while self._running and self._pending is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                (self._solving_key, fixed), self._pending = self._pending, None
+
+            solution = self.solve(fixed)
+
+            with self._condition:
+                self._solutions[self._solving_key] = solution
+                self._solving_key = None
+                # The solution without the player's paths is never evicted
+                limit = self.max_size + (FREE in self._solutions)
+                while len(self._solutions) > limit:
+                    oldest = next(iter(self._solutions))
+                    if oldest == FREE:
+                        self._solutions.move_to_end(FREE)
+                        continue
+                    del self._solutions[oldest]
+            if self.on_solved is not None:
+                self.on_solved()
@@ -0,0 +1,152 @@
+from utils import config
+
+
+class BoardLayout:
+    """
+    Position and size of the board on the screen for a grid size. The tile
+    size is chosen per grid so the board fits the window: grids up to 9x9
+    use TILE_SIZE, larger grids use smaller tiles down to MIN_TILE_SIZE.
+    If the board still doesn't fit the largest window, the window shows
+    the part of the board in the viewport, which can be scrolled.
+
+    The view and the controller share the layout, so the tiles are drawn
+    where the mouse finds them.
+    """
+
+    def __init__(
+        self,
+        rows: int,
+        cols: int,
+        max_size: tuple = (config.MAX_WIDTH, config.MAX_HEIGHT),
+    ) -> None:
+        """
+        Args:
+            rows (int): number of rows of the grid
+            cols (int): number of columns of the grid
+            max_size (tuple, optional): largest (width, height) of the window.
+            Defaults to (MAX_WIDTH, MAX_HEIGHT).
+
+        Attributes:
+            tile_size (int): side of a tile in px
+            width (int): width of the window in px
+            height (int): height of the window in px
+            viewport (tuple): (x, y, width, height) of the screen area that
+            shows the board
+            offset (list): [x, y] scroll of the board in px
+        """
+
+        self.rows = rows
+        self.cols = cols
+        self.fit(max_size)
+
+    def fit(self, max_size: tuple) -> None:
+        """Computes the tile size and the window size for the largest window
+        size. The scroll is reset.
+
+        Args:
+            max_size (tuple): largest (width, height) of the window
+        """
+
+        top = config.FONT_SIZE + config.MARGIN * 2
+        max_board = (
+            min(config.BOARD_SIZE, max_size[0] - config.MARGIN * 2),
+            min(config.BOARD_SIZE, max_size[1] - top - config.MARGIN),
+        )
+        # The largest tiles whose board fits the board area
+        self.tile_size = max(
+            config.MIN_TILE_SIZE,
+            min(config.TILE_SIZE, max_board[0] // self.cols, max_board[1] // self.rows),
+        )
+
+        board_width = self.tile_size * self.cols
+        board_height = self.tile_size * self.rows
+        self.width = min(
+            max_size[0], max(config.WIDTH, board_width + config.MARGIN * 2)
+        )
+        self.height = min(
+            max_size[1], max(config.HEIGHT, board_height + top + config.MARGIN)
+        )
+        self.viewport = (
+            config.MARGIN,
+            top,
+            min(board_width, self.width - config.MARGIN * 2),
+            min(board_height, self.height - top - config.MARGIN),
+        )
+        self.offset = [0, 0]
+
+    def is_scrollable(self) -> bool:
+        """Checks if the board is larger than the viewport."""
+
+        return (
+            self.tile_size * self.cols > self.viewport[2]
+            or self.tile_size * self.rows > self.viewport[3]
+        )
+
+    def scroll(self, dx: int, dy: int) -> bool:
+        """Scrolls the board, without leaving the viewport empty.
+
+        Args:
+            dx (int): px to scroll right
+            dy (int): px to scroll down
+
+        Returns:
+            bool: True if the scroll changed, False otherwise
+        """
+
+        max_x = self.tile_size * self.cols - self.viewport[2]
+        max_y = self.tile_size * self.rows - self.viewport[3]
+        offset = [
+            max(0, min(max_x, self.offset[0] + dx)),
+            max(0, min(max_y, self.offset[1] + dy)),
+        ]
+        if offset == self.offset:
+            return False
+        self.offset = offset
+        return True
+
+    def tile_pos(self, row: int, col: int) -> tuple[int, int]:
+        """Screen position of the top left corner of a tile.
+
+        Args:
+            row (int): the row of the tile
+            col (int): the column of the tile
+
+        Returns:
+            tuple[int, int]: the (x, y) of the tile
+        """
+
+        return (
+            self.viewport[0] + col * self.tile_size - self.offset[0],
+            self.viewport[1] + row * self.tile_size - self.offset[1],
+        )
+
+    def tile_at(self, pos: tuple) -> tuple[int, int]:
+        """Tile at a screen position. The position may be outside the board.
+
+        Args:
+            pos (tuple): the (x, y) screen position
+
+        Returns:
+            tuple[int, int]: the (row, col) of the tile
+        """
+
+        row = (pos[1] - self.viewport[1] + self.offset[1]) // self.tile_size
+        col = (pos[0] - self.viewport[0] + self.offset[0]) // self.tile_size
+        return (row, col)
+
+    def visible_tiles(self) -> tuple[range, range]:
+        """Rows and columns of the tiles that are (partly) in the viewport.
+        The other tiles are off-screen and don't need to be drawn.
+
+        Returns:
+            tuple[range, range]: the visible rows and the visible columns
+        """
+
+        first_row = self.offset[1] // self.tile_size
+        first_col = self.offset[0] // self.tile_size
+        last_row = -(-(self.offset[1] + self.viewport[3]) // self.tile_size)
+        last_col = -(-(self.offset[0] + self.viewport[2]) // self.tile_size)
+        return (
+            range(first_row, min(self.rows, last_row)),
+            range(first_col, min(self.cols, last_col)),
+        )
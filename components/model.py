@@ -20,21 +20,36 @@ class GameEngine(Listener):
         """
 
         self.event_manager = event_manager
-        self.event_manager.register_listener(self)
+        self.event_manager.subscribe(QuitEvent, self.on_quit)
+        self.event_manager.subscribe(TilePressedEvent, self.on_tile_pressed)
+        self.event_manager.subscribe(TileReleasedEvent, self.on_tile_released)
+        self.event_manager.subscribe(TileHoveredEvent, self.on_tile_hovered)
+        self.event_manager.subscribe(RestartEvent, self.on_restart)
         self.grid = grid
         self.running = False
 
-    def notify(self, event: Event) -> None:
-        if isinstance(event, QuitEvent):
-            self.running = False
-        elif isinstance(event, TilePressedEvent):
-            self.grid.start_path(*event.pos)
-        elif isinstance(event, TileReleasedEvent):
-            self.grid.end_path()
-        elif isinstance(event, TileHoveredEvent):
-            self.grid.continue_path(*event.pos)
-        elif isinstance(event, RestartEvent):
-            self.grid.restart()
+    def on_quit(self, event: QuitEvent) -> None:
+        self.running = False
+
+    def on_tile_pressed(self, event: TilePressedEvent) -> None:
+        self.grid.start_path(*event.pos)
+
+    def on_tile_released(self, event: TileReleasedEvent) -> None:
+        self.grid.end_path()
+
+    def on_tile_hovered(self, event: TileHoveredEvent) -> None:
+        self.grid.continue_path(*event.pos)
+
+    def on_restart(self, event: RestartEvent) -> None:
+        self.grid.restart()
+
+    def is_idle(self) -> bool:
+        """
+        Checks if the game state can only change by user input.
+        That is, when there is no path being drawn.
+        """
+
+        return not self.grid.is_pathing()
 
     def run(self) -> None:
         """
@@ -42,13 +57,15 @@ class GameEngine(Listener):
 
         The game engine loop is responsible for updating the
         game state. Currently, the game engine generates
-        the tick event every loop iteration.
+        the tick event every loop iteration. While the game is
+        idle, the controller blocks the tick until there is input.
         """
 
         self.running = True
         self.event_manager.post(InitEvent())
         print("Press R to restart")
+        print("Press H for a hint")
         print("Press CTRL + C to quit (WARNING: DO NOT USE THE EXIT WINDOW BUTTON)")
+        tick = TickEvent()
         while self.running:
-            tick = TickEvent()
             self.event_manager.post(tick)
@@ -0,0 +1,88 @@
+import time
+from collections import deque
+
+from utils import config
+
+
+class FrameProfiler:
+    """Records how long each section of the last frames took to draw. A
+    frame is started with start_frame, every section is ended with mark
+    and the frame is ended with end_frame."""
+
+    SECTIONS = ("sync", "blit", "text", "flip")
+
+    def __init__(self, max_frames: int = config.PROFILER_FRAMES) -> None:
+        """
+        Args:
+            max_frames (int, optional): number of frames whose times are
+            kept. Defaults to PROFILER_FRAMES.
+
+        Attributes:
+            frames (int): number of frames recorded so far
+            times (dict): the times in ms of the last frames, by section.
+            The "frame" section is the total time of the frame.
+        """
+
+        self.frames = 0
+        self.times = {
+            section: deque(maxlen=max_frames) for section in self.SECTIONS + ("frame",)
+        }
+        self._frame_start = 0.0
+        self._section_start = 0.0
+
+    def start_frame(self) -> None:
+        """Starts recording a frame."""
+
+        self._frame_start = self._section_start = time.perf_counter()
+
+    def mark(self, section: str) -> None:
+        """Ends a section of the frame, which started when the previous
+        section ended.
+
+        Args:
+            section (str): the section that ended (see SECTIONS)
+        """
+
+        now = time.perf_counter()
+        self.times[section].append((now - self._section_start) * 1000)
+        self._section_start = now
+
+    def end_frame(self) -> None:
+        """Ends recording the frame."""
+
+        self.times["frame"].append((time.perf_counter() - self._frame_start) * 1000)
+        self.frames += 1
+
+    def percentiles(self, section: str = "frame") -> tuple[float, float, float]:
+        """Calculates the p50, p95 and p99 times of a section over the
+        recorded frames.
+
+        Args:
+            section (str, optional): the section. Defaults to "frame".
+
+        Returns:
+            tuple[float, float, float]: p50, p95 and p99 times in ms
+        """
+
+        times = sorted(self.times[section])
+        if not times:
+            return (0.0, 0.0, 0.0)
+        return tuple(
+            times[min(len(times) - 1, int(len(times) * percent / 100))]
+            for percent in (50, 95, 99)
+        )
+
+    def report(self) -> str:
+        """Formats the percentiles of every section.
+
+        Returns:
+            str: a line per section with its p50, p95 and p99 times
+        """
+
+        lines = []
+        for section in self.SECTIONS + ("frame",):
+            p50, p95, p99 = self.percentiles(section)
+            lines.append(
+                f"{section:>5}: p50 {p50:.3f} ms, p95 {p95:.3f} ms, p99 {p99:.3f} ms"
+            )
+        return "\n".join(lines)
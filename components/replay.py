@@ -0,0 +1,215 @@
+import json, struct, time
+
+from .eventmanager import *
+from .grid import Grid
+from . import model
+
+# Recording file layout: header, grid JSON and fixed-size records
+MAGIC = b"FLWR"
+VERSION = 1
+HEADER = struct.Struct("<4sBI")  # magic, version, grid JSON length
+RECORD = struct.Struct("<IBbb")  # tick, event code, row, col
+
+# Code of every recorded event class
+EVENT_CODES = {
+    TilePressedEvent: 1,
+    TileHoveredEvent: 2,
+    TileReleasedEvent: 3,
+    RestartEvent: 4,
+}
+
+
+def _clamp(value: int) -> int:
+    """Clamps a tile coordinate to the range of a record."""
+
+    return max(-128, min(127, value))
+
+
+class Recorder(Listener):
+    """
+    Records the input events of a game with the tick they happened on,
+    so the game can be replayed later (see replay). The recording is
+    written to a file when the game quits.
+    """
+
+    def __init__(
+        self, event_manager: EventManager, model: model.GameEngine, file: str
+    ) -> None:
+        """
+        Args:
+            event_manager (EventManager): to subscribe to the events.
+            model (GameEngine): the game engine whose grid is recorded.
+            file (str): path to the recording file.
+
+        Attributes:
+            tick (int): number of ticks since the recording started
+            records (list): (tick, event code, row, col) of the events
+        """
+
+        self.event_manager = event_manager
+        self.event_manager.subscribe(TickEvent, self.on_tick)
+        self.event_manager.subscribe(QuitEvent, self.on_quit)
+        for event_class in EVENT_CODES:
+            self.event_manager.subscribe(event_class, self.on_input)
+        self.model = model
+        self.file = file
+
+        # The initial state of the grid, including any path drawn
+        # before the game starts (e.g. by the solver)
+        grid = self.model.grid
+        self.grid_config = {
+            "rows": grid.rows,
+            "cols": grid.cols,
+            "qpoints": grid.qpoints,
+            "points": grid.points,
+            "paths": [list(grid._paths[point + 1]) for point in range(grid.qpoints)],
+        }
+        self.tick = 0
+        self.records = []
+
+    def on_tick(self, event: TickEvent) -> None:
+        self.tick += 1
+
+    def on_input(self, event: Event) -> None:
+        row, col = getattr(event, "pos", None) or (0, 0)
+        self.records.append(
+            (self.tick, EVENT_CODES[event.__class__], _clamp(row), _clamp(col))
+        )
+
+    def on_quit(self, event: QuitEvent) -> None:
+        self.save()
+
+    def save(self) -> None:
+        """
+        Write the recording to the file.
+        """
+
+        save_recording(self.file, self.grid_config, self.records)
+        print(f"Recorded {len(self.records)} events to {self.file}")
+
+
+def save_recording(file: str, grid_config: dict, records: list) -> None:
+    """Writes a recording file.
+
+    Args:
+        file (str): path to the recording file
+        grid_config (dict): grid configuration, with the initial paths
+        records (list): (tick, event code, row, col) of the events
+    """
+
+    grid_json = json.dumps(grid_config, separators=(",", ":")).encode()
+    with open(file, "wb") as recording:
+        recording.write(HEADER.pack(MAGIC, VERSION, len(grid_json)))
+        recording.write(grid_json)
+        for record in records:
+            recording.write(RECORD.pack(*record))
+
+
+def load_recording(file: str) -> tuple[dict, list]:
+    """Loads a recording file.
+
+    Args:
+        file (str): path to the recording file
+
+    Raises:
+        Exception: if the file is not a recording
+
+    Returns:
+        tuple[dict, list]: grid configuration, with the initial paths,
+        and (tick, event code, row, col) of the events
+    """
+
+    with open(file, "rb") as recording:
+        data = recording.read()
+
+    magic, version, length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise Exception("Invalid recording file")
+
+    grid_config = json.loads(data[HEADER.size : HEADER.size + length])
+    grid_config["points"] = [
+        [tuple(point) for point in pair] for pair in grid_config["points"]
+    ]
+    grid_config["paths"] = [
+        [tuple(cell) for cell in path] for path in grid_config["paths"]
+    ]
+    records = list(RECORD.iter_unpack(data[HEADER.size + length :]))
+    return grid_config, records
+
+
+def _percentile(values: list, percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(len(values) * percent / 100))
+    return values[index]
+
+
+def replay(file: str, render: bool = False) -> dict:
+    """Replays a recording as fast as possible through the game engine,
+    and measures the time it takes to handle every recorded event.
+
+    Args:
+        file (str): path to the recording file
+        render (bool, optional): if True, the game is also drawn on every
+            recorded tick, without waiting for the frame rate. It requires
+            pygame, set SDL_VIDEODRIVER to "dummy" to render without a
+            display. Defaults to False.
+
+    Returns:
+        dict: the replayed grid, the number of events and ticks, the
+        events per second and the per-event latency percentiles (in us)
+    """
+
+    grid_config, records = load_recording(file)
+    grid = Grid.from_config(grid_config)
+    for point, path in enumerate(grid_config["paths"]):
+        if path:
+            grid.apply_path(point, path)
+
+    event_manager = EventManager()
+    gamemodel = model.GameEngine(event_manager, grid)
+    gameview = None
+    if render:
+        from . import view
+
+        gameview = view.GameView(event_manager, gamemodel)
+        event_manager.post(InitEvent())
+
+    events = {code: event_class for event_class, code in EVENT_CODES.items()}
+    last_tick = 0
+    latencies = []
+    start = time.perf_counter()
+    for record_tick, code, row, col in records:
+        # Draw the ticks that happened since the last event
+        if gameview is not None:
+            for _ in range(record_tick - last_tick):
+                gameview.draw()
+        last_tick = record_tick
+
+        event_class = events[code]
+        if issubclass(event_class, ReusableEvent):
+            event = event_class()
+        else:
+            event = event_class((row, col))
+
+        event_start = time.perf_counter_ns()
+        event_manager.post(event)
+        latencies.append((time.perf_counter_ns() - event_start) / 1000)
+    elapsed = time.perf_counter() - start
+
+    if gameview is not None:
+        event_manager.post(QuitEvent())
+
+    latencies.sort()
+    return {
+        "grid": grid,
+        "events": len(records),
+        "ticks": last_tick,
+        "events_per_second": len(records) / elapsed if elapsed else 0.0,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "max": latencies[-1] if latencies else 0.0,
+    }
@@ -0,0 +1,227 @@
+import json, os, signal, socketserver, threading, time
+from collections import deque
+from multiprocessing import Pool
+
+from .grid import Grid
+from .solver import Solver
+from utils import config, utils
+
+
+def solve_config(grid_config: dict, timeout: float = None) -> dict:
+    """Solves a grid configuration. It runs in the worker processes of the
+    service.
+
+    Args:
+        grid_config (dict): a valid grid configuration
+        timeout (float, optional): seconds the solver can run for.
+        Defaults to None, no limit.
+
+    Returns:
+        dict: if it was solved or it ran out of time, the path of every
+        point-pair if it was solved and the solve time in ms
+    """
+
+    grid = Grid.from_config(grid_config)
+    solver = Solver(grid)
+    start = time.perf_counter()
+    solved = solver.solve(timeout=timeout)
+    elapsed = time.perf_counter() - start
+    return {
+        "solved": solved,
+        "timed_out": solver.timed_out,
+        "paths": (
+            [grid._paths[point + 1] for point in range(grid.qpoints)] if solved else []
+        ),
+        "time": elapsed * 1000,
+    }
+
+
+def _init_worker() -> None:
+    """Prepares a worker process: interrupting the service stops it through
+    the main process, which lets the workers finish."""
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _percentile(values: list, percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(len(values) * percent / 100))
+    return values[index]
+
+
+class SolverService:
+    """
+    Local solver service. It keeps a pool of worker processes that are
+    started once, so a solve request doesn't pay for starting a process and
+    importing the game. Requests and responses are JSON-lines:
+
+        {"id": 1, "rows": 5, "cols": 5, "qpoints": 2, "points": [...], "timeout": 1}
+        {"id": 1, "solved": true, "timed_out": false, "paths": [...], "time": 0.4, "latency": 0.9}
+        {"id": 2, "command": "stats"}
+        {"id": 2, "requests": 1, "queue": 0, "workers": 4, "p50": 0.9, ...}
+
+    Responses are written as the requests are solved, so they may be out of
+    order. Invalid requests get a response with an "error".
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        timeout: float = config.SERVICE_TIMEOUT,
+        latency_window: int = config.SERVICE_LATENCY_WINDOW,
+    ) -> None:
+        """
+        Args:
+            workers (int, optional): number of worker processes. Defaults to
+            None, the number of CPUs.
+            timeout (float, optional): seconds a request can take to solve,
+            unless it has its own "timeout". Defaults to SERVICE_TIMEOUT.
+            latency_window (int, optional): number of requests whose latency
+            is kept for the stats. Defaults to SERVICE_LATENCY_WINDOW.
+
+        Attributes:
+            requests (int): number of solve requests received
+            queue (int): number of solve requests not solved yet
+            latencies (deque): latency in ms of the last solved requests,
+            from being received to being solved
+        """
+
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.pool = Pool(self.workers, _init_worker)
+        self.requests = 0
+        self.queue = 0
+        self.latencies = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict:
+        """Returns the number of requests, the queue depth and the latency
+        percentiles (in ms) of the last requests."""
+
+        with self._lock:
+            latencies = sorted(self.latencies)
+            return {
+                "requests": self.requests,
+                "queue": self.queue,
+                "workers": self.workers,
+                "p50": _percentile(latencies, 50),
+                "p95": _percentile(latencies, 95),
+                "p99": _percentile(latencies, 99),
+            }
+
+    def serve(self, lines, write) -> None:
+        """Handles the requests of a stream until it ends, and waits until
+        all of them are answered.
+
+        Args:
+            lines (iterable): the request lines
+            write (callable): writes a response line
+        """
+
+        answered = threading.Condition()
+        pending = 0
+
+        def respond(response: dict) -> None:
+            with answered:
+                write(json.dumps(response) + "\n")
+
+        def finish(request_id, received: float, response: dict) -> None:
+            nonlocal pending
+            latency = (time.perf_counter() - received) * 1000
+            with self._lock:
+                self.queue -= 1
+                self.latencies.append(latency)
+            response["id"] = request_id
+            response["latency"] = latency
+            with answered:
+                write(json.dumps(response) + "\n")
+                pending -= 1
+                answered.notify()
+
+        for line in lines:
+            if not line.strip():
+                continue
+            received = time.perf_counter()
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise Exception("Invalid request: not an object")
+            except Exception as e:
+                respond({"id": None, "error": str(e)})
+                continue
+
+            request_id = request.get("id")
+            if request.get("command") == "stats":
+                respond({"id": request_id, **self.stats()})
+                continue
+
+            try:
+                utils.validate_grid_config(request)
+                timeout = request.get("timeout", self.timeout)
+                if timeout is not None and not isinstance(timeout, (int, float)):
+                    raise Exception("Invalid request: timeout must be a number")
+            except Exception as e:
+                respond({"id": request_id, "error": str(e)})
+                continue
+
+            grid_config = {
+                "rows": request["rows"],
+                "cols": request["cols"],
+                "qpoints": request["qpoints"],
+                "points": [
+                    [tuple(point) for point in pair] for pair in request["points"]
+                ],
+            }
+            with self._lock:
+                self.requests += 1
+                self.queue += 1
+            with answered:
+                pending += 1
+            self.pool.apply_async(
+                solve_config,
+                (grid_config, timeout),
+                callback=lambda response, request_id=request_id, received=received: finish(
+                    request_id, received, response
+                ),
+                error_callback=lambda e, request_id=request_id, received=received: finish(
+                    request_id, received, {"error": str(e)}
+                ),
+            )
+
+        with answered:
+            answered.wait_for(lambda: pending == 0)
+
+    def serve_socket(self, path: str) -> None:
+        """Handles the requests of the connections to a Unix socket, a stream
+        per connection, until the service is interrupted.
+
+        Args:
+            path (str): path to the Unix socket
+        """
+
+        service = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                def write(line: str) -> None:
+                    self.wfile.write(line.encode())
+                    self.wfile.flush()
+
+                service.serve((line.decode() for line in self.rfile), write)
+
+        if os.path.exists(path):
+            os.remove(path)
+        with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+            try:
+                server.serve_forever()
+            finally:
+                os.remove(path)
+
+    def close(self) -> None:
+        """Stops the worker processes."""
+
+        self.pool.close()
+        self.pool.join()
@@ -1,9 +1,154 @@
-from queue import PriorityQueue
+import json, time
+from array import array
+from collections import OrderedDict
+from heapq import heappop, heappush
 
 from .grid import Grid
 from utils import config
 
 
+# Neighbor tables by grid shape, see neighbor_table
+_neighbor_tables = {}
+
+
+def neighbor_table(rows: int, cols: int) -> tuple[tuple, tuple]:
+    """Calculates the cells of a grid shape by id (row * cols + col) and the
+    ids of the neighbors of every cell inside the grid, in N, S, E, W order.
+    The table of a shape is calculated once.
+
+    Args:
+        rows (int): The rows of the grid
+        cols (int): The columns of the grid
+
+    Returns:
+        tuple[tuple, tuple]: The cells and the neighbor ids, by cell id"""
+
+    table = _neighbor_tables.get((rows, cols))
+    if table is None:
+        cells = tuple((row, col) for row in range(rows) for col in range(cols))
+        neighbors = tuple(
+            tuple(
+                (row + d_row) * cols + col + d_col
+                for d_row, d_col in ((-1, 0), (1, 0), (0, 1), (0, -1))
+                if 0 <= row + d_row < rows and 0 <= col + d_col < cols
+            )
+            for row, col in cells
+        )
+        table = _neighbor_tables[(rows, cols)] = (cells, neighbors)
+    return table
+
+
+# Solver profile loaded from SOLVER_PROFILE, see load_profile
+_profile = None
+
+
+def size_class(rows: int, cols: int) -> str:
+    """Finds the size class of a grid (see SOLVER_SIZE_CLASSES).
+
+    Args:
+        rows (int): The rows of the grid
+        cols (int): The columns of the grid
+
+    Returns:
+        str: The first size class whose largest side fits the grid"""
+
+    for name, side in config.SOLVER_SIZE_CLASSES.items():
+        if max(rows, cols) <= side:
+            return name
+    # Grids larger than every class are in the largest class
+    return list(config.SOLVER_SIZE_CLASSES)[-1]
+
+
+def load_profile(file: str = config.SOLVER_PROFILE) -> dict:
+    """Loads the solver parameters of every size class from a solver profile
+    (see run_tuning_experiment.py). The profile is loaded once per process.
+
+    Args:
+        file (str, optional): Path to the profile. Defaults to SOLVER_PROFILE.
+
+    Returns:
+        dict: The parameters by size class, empty if there is no profile"""
+
+    global _profile
+    if _profile is None:
+        try:
+            with open(file, "r") as profile:
+                classes = json.load(profile)["classes"]
+            _profile = {name: values["params"] for name, values in classes.items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            _profile = {}
+    return _profile
+
+
+def solver_params(rows: int, cols: int) -> dict:
+    """Finds the solver parameters of a grid: the parameters of its size class
+    in the solver profile, or the configuration defaults.
+
+    Args:
+        rows (int): The rows of the grid
+        cols (int): The columns of the grid
+
+    Returns:
+        dict: added_cost_factor, max_repetitions and window_repetition"""
+
+    params = {
+        "added_cost_factor": config.ADDED_COST_FACTOR,
+        "max_repetitions": config.MAX_REPETITIONS,
+        "window_repetition": config.WINDOW_REPETITION,
+    }
+    params.update(load_profile().get(size_class(rows, cols), {}))
+    return params
+
+
+class TriedPaths:
+    """Bounded set of the tried paths of a point-pair. When the set is full,
+    the least recently tried path is forgotten, so the memory of a solve
+    doesn't grow with the length of the search."""
+
+    def __init__(self, max_size: int = config.MAX_TRIED_PATHS) -> None:
+        """
+        Args:
+            max_size (int, optional): maximum number of paths.
+            Defaults to MAX_TRIED_PATHS.
+
+        Attributes:
+            peak (int): the most paths the set had at once
+            evictions (int): number of paths forgotten because the set was full
+        """
+
+        self.max_size = max_size
+        self.peak = 0
+        self.evictions = 0
+        self._paths = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, path: int) -> bool:
+        if path in self._paths:
+            self._paths.move_to_end(path)
+            return True
+        return False
+
+    def add(self, path: int) -> None:
+        """Adds a tried path, forgetting the least recently tried path if
+        the set is full.
+
+        Args:
+            path (int): the flattened path
+        """
+
+        self._paths[path] = True
+        self._paths.move_to_end(path)
+        if len(self._paths) > self.max_size:
+            self._paths.popitem(last=False)
+            self.evictions += 1
+        self.peak = max(self.peak, len(self._paths))
+
+    def clear(self) -> None:
+        self._paths.clear()
+
+
 class Solver:
     """Solver that solves the grid of a game. It receives a grid
     and attempts to solve it. However, it does not guarantee a
@@ -12,56 +157,40 @@ class Solver:
     The solve algorithm is based on the A* search algorithm.
     """
 
-    def __init__(self, grid: Grid) -> None:
+    def __init__(self, grid: Grid, params: dict = None) -> None:
         """Initializes the solver with a grid.
 
         Args:
             grid (Grid): The grid to solve. It must be a valid grid.
+            params (dict, optional): The solver parameters (see solver_params).
+                Defaults to None, the parameters of the grid's size class.
         """
 
         self.grid = grid
-        # Each point-pair has an added cost for the paths it can take
+        if params is None:
+            params = solver_params(self.grid.rows, self.grid.cols)
+        self.max_repetitions = params["max_repetitions"]
+        self.window_repetition = params["window_repetition"]
+        # Cells by id (row * cols + col) and the ids of their neighbors
+        self._cells, self._neighbors = neighbor_table(self.grid.rows, self.grid.cols)
+        # Each point-pair has an added cost for the paths it can take,
+        # by cell id. The costs are reset in place from _no_costs
+        self._no_costs = array("q", bytes(array("q").itemsize * len(self._cells)))
         self._added_costs = [
-            [[0 for _ in range(self.grid.cols)] for _ in range(self.grid.rows)]
-            for _ in range(self.grid.qpoints)
+            array("q", self._no_costs) for _ in range(self.grid.qpoints)
         ]
-        # Each point-pair has a dictionary of tried paths
+        # Each point-pair has a bounded set of tried paths
         # (Attempted paths that didn't reach a solution)
-        self._tried_paths = [{} for _ in range(self.grid.qpoints)]
+        self._tried_paths = [TriedPaths() for _ in range(self.grid.qpoints)]
 
         # The added cost of running a path is enough to encourage
         # the algorithm to try different paths the next iteration
-        self.ADDED_COST = self.grid.rows * self.grid.cols
-
-    def _get_neighbors(
-        self, point: int, cell: tuple[int, int]
-    ) -> list[tuple[int, int]]:
-        """Calculates the valid neighbors of a cell.
-
-        Args:
-            point (int): The point-pair index of the cell
-            cell (tuple[int, int]): The cell to get the neighbors of
+        self.ADDED_COST = max(
+            1, round(params["added_cost_factor"] * self.grid.rows * self.grid.cols)
+        )
 
-        Returns:
-            list[tuple[int, int]]: The neighbors of the cell"""
-
-        # Neighbors in N, S, E, W directions
-        pos_neighbors = [(-1, 0), (1, 0), (0, 1), (0, -1)]
-        neighbors = [(cell[0] + pos[0], cell[1] + pos[1]) for pos in pos_neighbors]
-
-        # Remove neighbors that are out of bounds or that aren't empty or the end point
-        return [
-            neighbor
-            for neighbor in neighbors
-            if (
-                0 <= neighbor[0] < self.grid.rows
-                and 0 <= neighbor[1] < self.grid.cols
-                and (
-                    self.grid.grid[neighbor[0]][neighbor[1]][0] == 0
-                    or neighbor == self.grid.points[point][1]
-                )
-            )
-        ]
+        # If the last solve stopped because it ran out of time
+        self.timed_out = False
 
     def _distance_between(self, cell1: tuple[int, int], cell2: tuple[int, int]) -> int:
         """Calculates the manhattan distance between two cells on the grid.
@@ -95,8 +224,10 @@ class Solver:
             point (int): The point-pair index of the path
             path (list[tuple[int, int]]): The path to add costs to"""
 
+        costs = self._added_costs[point]
+        cols = self.grid.cols
         for cell in path[1:-1]:  # exclude start and end cells
-            self._added_costs[point][cell[0]][cell[1]] += self.ADDED_COST
+            costs[cell[0] * cols + cell[1]] += self.ADDED_COST
 
     def _restart_costs(self, point: int) -> None:
         """Resets the added costs for a point-pair.
@@ -104,9 +235,7 @@ class Solver:
         Args:
             point (int): The point-pair index"""
 
-        self._added_costs[point] = [
-            [0 for _ in range(self.grid.cols)] for _ in range(self.grid.rows)
-        ]
+        self._added_costs[point][:] = self._no_costs
 
     def _solve_point(self, point: int) -> list[tuple[int, int]]:
         """Finds the best path for a point-pair. It does so by using A*.
@@ -121,50 +250,50 @@ class Solver:
         start = self.grid.points[point][0]
         end = self.grid.points[point][1]
 
-        # priority queue of cells to visit (f_cost, cell)
-        queue = PriorityQueue()
-        queue.put((0, start))
+        # The search works with cell ids (see neighbor_table), whose order
+        # is the order of the cells, so ties are broken as with the cells
+        grid = self.grid.grid
+        cells = self._cells
+        neighbors = self._neighbors
+        costs = self._added_costs[point]
+        start_id = start[0] * self.grid.cols + start[1]
+        end_id = end[0] * self.grid.cols + end[1]
+
+        # priority queue of cells to visit (f_cost, cell id)
+        queue = [(0, start_id)]
 
-        # dictionary of cells that have been visited
+        # dictionary of cells that have been visited, (g_cost, parent) by id
         visited = dict()
-        visited[start] = (0, None)
+        visited[start_id] = (0, None)
 
-        while not queue.empty():
-            current = queue.get()[1]
-            if current == end:
+        while queue:
+            current = heappop(queue)[1]
+            if current == end_id:
                 break
 
-            for neighbor in self._get_neighbors(point, current):
-                g_cost = (
-                    visited[current][0]
-                    + 1
-                    + self._added_costs[point][neighbor[0]][neighbor[1]]
-                )
-                h_cost = self._get_heuristic(neighbor, end)
-                f_cost = g_cost + h_cost
+            current_cost = visited[current][0] + 1
+            for neighbor in neighbors[current]:
+                cell = cells[neighbor]
+                # Only empty cells and the end point can be visited
+                if grid[cell[0]][cell[1]][0] != 0 and neighbor != end_id:
+                    continue
 
+                g_cost = current_cost + costs[neighbor]
                 if neighbor in visited and visited[neighbor][0] <= g_cost:
                     continue
 
-                queue.put(
-                    (
-                        f_cost,
-                        neighbor,
-                    )
-                )
-                visited[neighbor] = (
-                    g_cost,
-                    current,
-                )
+                f_cost = g_cost + self._get_heuristic(cell, end)
+                heappush(queue, (f_cost, neighbor))
+                visited[neighbor] = (g_cost, current)
 
-        if end not in visited:
+        if end_id not in visited:
             return []
 
         # Get the path from the visited dictionary
         path = []
-        current = end
+        current = end_id
         while current is not None:
-            path.append(current)
+            path.append(cells[current])
             current = visited[current][1]
 
         # Add cost to the cells in the path
@@ -190,14 +319,29 @@ class Solver:
             point (int): The point-pair index"""
 
         self._restart_costs(point)
-        self._tried_paths[point] = {}
-        self.grid.remove_path(point)
+        self._tried_paths[point].clear()
+        self.grid.clear_path(point)
+
+    def tried_paths_stats(self) -> dict:
+        """Reports the occupancy of the tried paths sets of the point-pairs.
+
+        Returns:
+            dict: the paths in the sets, their capacity, the most paths a set
+            had at once and the paths forgotten because a set was full
+        """
+
+        return {
+            "size": sum(len(tried) for tried in self._tried_paths),
+            "capacity": sum(tried.max_size for tried in self._tried_paths),
+            "peak": max((tried.peak for tried in self._tried_paths), default=0),
+            "evictions": sum(tried.evictions for tried in self._tried_paths),
+        }
 
     def is_repeating(self, tried_paths: list[int]) -> bool:
         """Checks if a sequence of trieds paths is repeating. This is done by
         executing a sliding window algorithm from size 1 to (1 / REPEATING WINDOW)
         the length of the sequence. The check is done by comparing if the window
-        occurs WINDOW_REPETITION times at the end of the sequence.
+        occurs window_repetition times at the end of the sequence.
 
         Args:
             tried_paths (list[int]): The list of tried paths
@@ -206,7 +350,7 @@ class Solver:
             bool: True if the sequence is repeating, False otherwise"""
 
         # if the sequence is 1 2 3 4 5 6 7 8 9
-        # WINDOW_REPETITION = 3
+        # window_repetition = 3
         # and the current window size is 3
         # then the checked windows will be
         # 1 2 3 [4 5 6] [7 8 9]
@@ -214,13 +358,13 @@ class Solver:
         # if they are all equal, then the sequence is repeating
         # otherwise, they sequence is not repeating at the current window size
 
-        if len(tried_paths) < config.WINDOW_REPETITION:
+        if len(tried_paths) < self.window_repetition:
             return False
 
-        for window_size in range(1, (len(tried_paths) // config.WINDOW_REPETITION) + 1):
+        for window_size in range(1, (len(tried_paths) // self.window_repetition) + 1):
 
             repeating = True
-            for i in range(config.WINDOW_REPETITION - 1):
+            for i in range(self.window_repetition - 1):
                 window1 = (
                     tried_paths[-(i + 1) * window_size :]
                     if i == 0
@@ -250,28 +394,109 @@ class Solver:
                 print(row)
         print()
 
-    def solve(self, debug=False) -> bool:
+    def _out_of_time(self, deadline: float, debug=False) -> bool:
+        """Checks if a solve ran out of time, setting timed_out if it did.
+
+        Args:
+            deadline (float): perf_counter time the solve must end by, or
+                None if there is no limit
+            debug (bool, optional): If True, prints when the solve is out of
+                time. Defaults to False.
+
+        Returns:
+            bool: True if the deadline passed, False otherwise"""
+
+        if deadline is None or time.perf_counter() <= deadline:
+            return False
+        print("Out of time, stopping...\n") if debug else None
+        self.timed_out = True
+        return True
+
+    def _fill_empty_cells(self, fixed: tuple = ()) -> bool:
+        """Fills the empty cells left once every point-pair is connected. A
+        step of a path whose two side cells are empty detours through them,
+        which is repeated until no path can grow. The grid only changes if
+        every cell is filled.
+
+        Args:
+            fixed (tuple, optional): Indexes of the point-pairs whose paths
+                must be kept. Defaults to none.
+
+        Returns:
+            bool: True if the grid was filled, False otherwise"""
+
+        grid = self.grid.grid
+        empty = {(row, col) for row, col in self._cells if grid[row][col][0] == 0}
+        paths = {
+            point: list(self.grid._paths[point + 1])
+            for point in range(self.grid.qpoints)
+            if point not in fixed
+        }
+
+        growing = True
+        while empty and growing:
+            growing = False
+            for path in paths.values():
+                i = 0
+                while i < len(path) - 1:
+                    (row1, col1), (row2, col2) = path[i], path[i + 1]
+                    d_row, d_col = row2 - row1, col2 - col1
+                    # The cells to both sides of the step
+                    for side_row, side_col in ((d_col, d_row), (-d_col, -d_row)):
+                        side1 = (row1 + side_row, col1 + side_col)
+                        side2 = (row2 + side_row, col2 + side_col)
+                        if side1 in empty and side2 in empty:
+                            path[i + 1 : i + 1] = [side1, side2]
+                            empty.difference_update((side1, side2))
+                            growing = True
+                            break
+                    i += 1
+
+        if empty:
+            return False
+        for point, path in paths.items():
+            self.grid.clear_path(point)
+            self.grid.apply_path(point, path)
+        return True
+
+    def solve(self, debug=False, timeout: float = None, fixed: tuple = ()) -> bool:
         """Solves the grid. It does so by finding the best path for each point-pair.
         The paths are solved in order and the algorithm may backtrack if it can't
         find a path for the current point-pair. The algorithm may also backtrack if
-        it detects that it is repeating itself. The algorithm stops when the grid is
-        fully solved (progress is 1) or if it wasn't able to find a solution.
+        it detects that it is repeating itself. Once every point-pair is connected,
+        the paths grow into the cells left empty. The algorithm stops when the grid is
+        fully solved (progress is 1), if it wasn't able to find a solution or if
+        it ran out of time (see timed_out).
 
         Args:
             debug (bool, optional): If True, the algorithm will print debug information.
                 Defaults to False.
+            timeout (float, optional): Seconds the algorithm can run for. Defaults
+                to None, no limit.
+            fixed (tuple, optional): Indexes of the point-pairs whose paths are
+                already on the grid and must be kept. Defaults to none.
 
         Returns:
             bool: True if the grid was solved, False otherwise"""
 
-        point = 0  # the current point-pair index
+        # The point-pairs to solve, in order
+        order = [point for point in range(self.grid.qpoints) if point not in fixed]
+        if not order:
+            return self.grid.progress() == 1
+        index = 0  # the index of the current point-pair in order
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        self.timed_out = False
         self._print_grid() if debug else None
 
         while True:
+            if self._out_of_time(deadline, debug):
+                return False
+
+            point = order[index]
             print("Solving point:", point + 1) if debug else None
 
             # Remove path of the current point-pair
-            self.grid.remove_path(point)
+            self.grid.clear_path(point)
 
             # Find a path for the current point-pair
             path = self._solve_point(point)
@@ -281,9 +506,9 @@ class Solver:
 
                 # If there is no path, backtrack to the previous point
                 self._restart_point(point)
-                point -= 1
+                index -= 1
                 # If there is no previous point, there is no solution
-                if point < 0:
+                if index < 0:
                     return False
                 continue
 
@@ -295,6 +520,9 @@ class Solver:
             repeating = False
             repeats = 0
             while flattened_path in self._tried_paths[point]:
+                # Stop here, the last path found was already tried
+                if self._out_of_time(deadline, debug):
+                    return False
                 repeats += 1
 
                 print(
@@ -307,16 +535,16 @@ class Solver:
 
                 print("\tFound path:", flattened_path) if debug else None
 
-                if self.is_repeating(tried_paths) or repeats > config.MAX_REPETITIONS:
+                if self.is_repeating(tried_paths) or repeats > self.max_repetitions:
                     print(
                         "\n\tPath finding is repeating, backtracking...\n"
                     ) if debug else None
 
                     repeating = True
                     self._restart_point(point)
-                    point -= 1
+                    index -= 1
                     # If there is no previous point, there is no solution
-                    if point < 0:
+                    if index < 0:
                         return False
                     break
 
@@ -324,10 +552,10 @@ class Solver:
                 continue
 
             # Add the path to the tried paths
-            self._tried_paths[point][flattened_path] = True
+            self._tried_paths[point].add(flattened_path)
 
             # Add the path to the grid
-            self.grid.add_path(path)
+            self.grid.apply_path(point, path)
 
             self._print_grid() if debug else None
 
@@ -336,8 +564,12 @@ class Solver:
                 return True
 
             # Move to the next point
-            point += 1
-
-            # If the point is out of bounds, the algorithm found no solution
-            if point >= self.grid.qpoints:
-                return False
+            index += 1
+
+            # Every point-pair is connected but some cells are empty. If the
+            # paths can't grow into them, the last point-pair tries again
+            if index >= len(order):
+                if self._fill_empty_cells(fixed):
+                    self._print_grid() if debug else None
+                    return True
+                index -= 1
@@ -0,0 +1,156 @@
+import threading
+from collections import OrderedDict
+
+import pygame as pg
+
+from utils import config
+
+
+class ThumbnailCache:
+    """Thumbnails of the levels of a level pack, drawn from their points. The
+    thumbnails are rendered by a background thread, so showing a page of
+    levels never waits for them: a thumbnail that isn't rendered yet is
+    requested and drawn once it is ready. Only the requested thumbnails are
+    rendered, and the least recently used are evicted when the cache is full."""
+
+    def __init__(
+        self,
+        levels,
+        palette: dict = config.COLORS,
+        size: int = config.THUMBNAIL_SIZE,
+        max_size: int = config.THUMBNAIL_CACHE_SIZE,
+        on_rendered=None,
+    ) -> None:
+        """
+        Args:
+            levels (LevelPack): the levels, loaded by the background thread
+            palette (dict, optional): the colors of the points, in order.
+            Defaults to COLORS.
+            size (int, optional): width and height of a thumbnail.
+            Defaults to THUMBNAIL_SIZE.
+            max_size (int, optional): maximum number of thumbnails.
+            Defaults to THUMBNAIL_CACHE_SIZE.
+            on_rendered (callable, optional): called from the background
+            thread with the index of every rendered thumbnail (e.g. to post
+            an event that redraws the screen). Defaults to None.
+        """
+
+        self.levels = levels
+        self.colors = list(palette.values())
+        self.size = size
+        self.max_size = max_size
+        self.on_rendered = on_rendered
+
+        self._cache = OrderedDict()
+        self._pending = []
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, index: int) -> pg.Surface | None:
+        """Returns the thumbnail of a level if it is rendered.
+
+        Args:
+            index (int): index of the level
+
+        Returns:
+            pg.Surface | None: the thumbnail, or None if it isn't rendered yet
+        """
+
+        with self._condition:
+            thumbnail = self._cache.get(index)
+            if thumbnail is not None:
+                self._cache.move_to_end(index)
+            return thumbnail
+
+    def request(self, indices: list) -> None:
+        """Sets the levels whose thumbnails must be rendered, in order. Levels
+        requested before that aren't rendered yet are dropped, so only the
+        thumbnails of the last requested pages are rendered.
+
+        Args:
+            indices (list): indexes of the levels
+        """
+
+        with self._condition:
+            for index in indices:
+                if index in self._cache:
+                    self._cache.move_to_end(index)
+            self._pending = [index for index in indices if index not in self._cache]
+            # Pending indexes are popped from the end
+            self._pending.reverse()
+            self._condition.notify()
+
+    def pending(self) -> int:
+        """Returns the number of thumbnails waiting to be rendered."""
+
+        with self._condition:
+            return len(self._pending)
+
+    def close(self) -> None:
+        """Stops the background thread."""
+
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join()
+
+    def render(self, grid_config: dict) -> pg.Surface:
+        """Draws the thumbnail of a level: its cells and its points.
+
+        Args:
+            grid_config (dict): grid configuration of the level
+
+        Returns:
+            pg.Surface: the thumbnail
+        """
+
+        rows, cols = grid_config["rows"], grid_config["cols"]
+        cell = self.size // max(rows, cols)
+        offset_x = (self.size - cell * cols) // 2
+        offset_y = (self.size - cell * rows) // 2
+
+        thumbnail = pg.Surface((self.size, self.size))
+        thumbnail.fill((0, 0, 0))
+        for row in range(rows):
+            for col in range(cols):
+                rect = (offset_x + col * cell, offset_y + row * cell, cell, cell)
+                pg.draw.rect(thumbnail, (64, 64, 64), rect, 1)
+
+        for i, pair in enumerate(grid_config["points"]):
+            color = self.colors[i % len(self.colors)]
+            for row, col in pair:
+                center = (
+                    offset_x + col * cell + cell // 2,
+                    offset_y + row * cell + cell // 2,
+                )
+                pg.draw.circle(thumbnail, color, center, max(1, cell * 3 // 8))
+        return thumbnail
+
+    def _work(self) -> None:
+        """Renders the pending thumbnails until the cache is closed."""
+
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                index = self._pending.pop()
+
+            try:
+                thumbnail = self.render(self.levels[index])
+            except Exception:
+                # Invalid levels get an empty thumbnail
+                thumbnail = pg.Surface((self.size, self.size))
+
+            with self._condition:
+                self._cache[index] = thumbnail
+                while len(self._cache) > self.max_size:
+                    self._cache.popitem(last=False)
+            if self.on_rendered is not None:
+                self.on_rendered(index)
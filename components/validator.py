@@ -0,0 +1,161 @@
+import math
+
+import numpy as np
+
+from .grid import Grid
+
+# (row, col) offset of each direction code (0: none, 1: up, 2: right,
+# 3: down, 4: left, 5: middle of a path)
+_ROW_OFFSET = np.array([0, -1, 0, 1, 0, 0])
+_COL_OFFSET = np.array([0, 0, 1, 0, -1, 0])
+# Opposite of each direction code
+_OPPOSITE = np.array([0, 3, 4, 1, 2, 0])
+
+
+def grid_to_array(grid: Grid) -> np.ndarray:
+    """Converts the state of a grid into an integer matrix.
+
+    Args:
+        grid (Grid): the grid to convert
+
+    Returns:
+        np.ndarray: rows * cols * 3 matrix with the (color, in, out) state
+        of every cell
+    """
+
+    return np.asarray(grid.grid, dtype=np.int8).reshape(grid.rows, grid.cols, 3)
+
+
+def points_to_array(points: list) -> np.ndarray:
+    """Converts the points of a grid into an integer matrix.
+
+    Args:
+        points (list): 2D list of (row, col) tuples as in the Grid constructor
+
+    Returns:
+        np.ndarray: qpoints * 2 * 2 matrix with the points positions
+    """
+
+    return np.asarray(points, dtype=np.intp).reshape(len(points), 2, 2)
+
+
+def validate_solution(boards: np.ndarray, points: np.ndarray) -> np.ndarray | bool:
+    """Checks if boards are fully solved. A board is solved if:
+    - Every cell is filled with a color.
+    - Every point-pair is connected by a single simple path of its color,
+      where the points are the only ends of the path.
+    - The direction states of every cell agree with its neighbors'. That is,
+      if a cell goes out to a neighbor, the neighbor comes in from the cell.
+
+    The checks are done with array operations over the whole batch, so
+    validating many boards of the same size at once is cheap.
+
+    Args:
+        boards (np.ndarray): rows * cols * 3 board (see grid_to_array), or a
+            batch of them with shape batch * rows * cols * 3
+        points (np.ndarray): qpoints * 2 * 2 points of the boards (see
+            points_to_array), or a batch with shape batch * qpoints * 2 * 2
+
+    Returns:
+        np.ndarray | bool: whether each board is solved. A single bool if
+        a single board is given
+    """
+
+    boards = np.asarray(boards)
+    single = boards.ndim == 3
+    if single:
+        boards = boards[np.newaxis]
+    batch, rows, cols, _ = boards.shape
+    points = np.broadcast_to(
+        np.asarray(points, dtype=np.intp), (batch,) + np.shape(points)[-3:]
+    )
+    qpoints = points.shape[1]
+    cells = rows * cols
+
+    color = boards[..., 0].reshape(batch, cells).astype(np.intp)
+    pos_in = boards[..., 1].reshape(batch, cells).astype(np.intp)
+    pos_out = boards[..., 2].reshape(batch, cells).astype(np.intp)
+    valid = ((color >= 1) & (color <= qpoints)).all(axis=1)
+    valid &= ((pos_in >= 0) & (pos_in <= 4) & (pos_out >= 0) & (pos_out <= 4)).all(
+        axis=1
+    )
+    # Keep the directions in range so invalid boards can still be indexed
+    pos_in = np.clip(pos_in, 0, 5)
+    pos_out = np.clip(pos_out, 0, 5)
+
+    # The points must be in the grid, all different and have their color
+    point_rows, point_cols = points[..., 0], points[..., 1]
+    valid &= (
+        (point_rows >= 0)
+        & (point_rows < rows)
+        & (point_cols >= 0)
+        & (point_cols < cols)
+    ).all(axis=(1, 2))
+    point_cells = (
+        np.clip(point_rows, 0, rows - 1) * cols + np.clip(point_cols, 0, cols - 1)
+    ).reshape(batch, qpoints * 2)
+    is_point = np.zeros((batch, cells), dtype=bool)
+    is_point[np.arange(batch)[:, np.newaxis], point_cells] = True
+    valid &= is_point.sum(axis=1) == qpoints * 2
+    point_colors = np.repeat(np.arange(1, qpoints + 1), 2)
+    valid &= (np.take_along_axis(color, point_cells, axis=1) == point_colors).all(
+        axis=1
+    )
+
+    # Points are the ends of their path: exactly one of in / out is set.
+    # Any other cell goes through: in and out are set and different
+    ends = (pos_in == 0) != (pos_out == 0)
+    through = (pos_in != 0) & (pos_out != 0) & (pos_in != pos_out)
+    valid &= np.where(is_point, ends, through).all(axis=1)
+
+    # Neighbors must agree on the direction states
+    cell_index = np.arange(cells)
+    cell_rows, cell_cols = np.divmod(cell_index, cols)
+
+    def neighbors(pos: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Index of the neighbor in each cell's direction pos, and whether
+        the neighbor is inside the grid."""
+
+        neighbor_rows = cell_rows + _ROW_OFFSET[pos]
+        neighbor_cols = cell_cols + _COL_OFFSET[pos]
+        inside = (
+            (neighbor_rows >= 0)
+            & (neighbor_rows < rows)
+            & (neighbor_cols >= 0)
+            & (neighbor_cols < cols)
+        )
+        index = np.where(inside, neighbor_rows * cols + neighbor_cols, cell_index)
+        return index, inside
+
+    next_cell, inside = neighbors(pos_out)
+    agrees = inside & (np.take_along_axis(color, next_cell, axis=1) == color)
+    agrees &= np.take_along_axis(pos_in, next_cell, axis=1) == _OPPOSITE[pos_out]
+    valid &= np.where(pos_out != 0, agrees, True).all(axis=1)
+
+    prev_cell, inside = neighbors(pos_in)
+    agrees = inside & (np.take_along_axis(color, prev_cell, axis=1) == color)
+    agrees &= np.take_along_axis(pos_out, prev_cell, axis=1) == _OPPOSITE[pos_in]
+    valid &= np.where(pos_in != 0, agrees, True).all(axis=1)
+
+    # Following the out directions from any cell must reach the end of a path,
+    # otherwise the cell is part of a loop. The walk is done by pointer
+    # doubling, so it takes log2(cells) steps instead of cells steps
+    jump = np.where(pos_out != 0, next_cell, cell_index)
+    for _ in range(max(1, math.ceil(math.log2(cells)))):
+        jump = np.take_along_axis(jump, jump, axis=1)
+    valid &= (np.take_along_axis(pos_out, jump, axis=1) == 0).all(axis=1)
+
+    return bool(valid[0]) if single else valid
+
+
+def validate_grid(grid: Grid) -> bool:
+    """Checks if a grid is fully solved (see validate_solution).
+
+    Args:
+        grid (Grid): the grid to check
+
+    Returns:
+        bool: True if the grid is solved, False otherwise
+    """
+
+    return validate_solution(grid_to_array(grid), points_to_array(grid.points))
@@ -4,7 +4,9 @@ import pygame.freetype as pgft
 
 from . import model
 from .eventmanager import *
-from utils import config, utils
+from .layout import BoardLayout
+from .profiler import FrameProfiler
+from utils import config, graphics, utils
 
 
 class Tile(pg.sprite.Sprite):
@@ -13,12 +15,19 @@ class Tile(pg.sprite.Sprite):
     in the game."""
 
     def __init__(
-        self, tiles: dict, colors: list, row: int, col: int, state: tuple = (0, 0, 0)
+        self,
+        tiles: dict,
+        colors: list,
+        layout: BoardLayout,
+        row: int,
+        col: int,
+        state: tuple = (0, 0, 0),
     ):
         """
         Args:
             tiles (dict): the tiles sprites
             colors (list): the colors of the tiles
+            layout (BoardLayout): the position of the board on the screen
             row (int): the row of the tile in the grid
             col (int): the column of the tile in the grid
             state (tuple, optional): state of the tile. Defaults to (0, 0, 0).
@@ -27,6 +36,7 @@ class Tile(pg.sprite.Sprite):
 
         self.tiles = tiles
         self.colors = colors
+        self.layout = layout
         self.row = row
         self.col = col
         self.state = state
@@ -36,8 +46,7 @@ class Tile(pg.sprite.Sprite):
 
         self.image = self.tiles[self.colors[self.state[0]]][self.state[1:]]
         self.rect = self.image.get_rect()
-        self.rect.x = self.col * config.TILE_SIZE + config.MARGIN
-        self.rect.y = self.row * config.TILE_SIZE + config.FONT_SIZE + config.MARGIN * 2
+        self.rect.topleft = self.layout.tile_pos(self.row, self.col)
 
 
 class GameView(Listener):
@@ -45,93 +54,276 @@ class GameView(Listener):
     The View of the game. It is responsible for drawing the game state to the screen.
     """
 
-    def __init__(self, event_manager: EventManager, model: model.GameEngine, colored_tiles=None) -> None:
+    def __init__(
+        self,
+        event_manager: EventManager,
+        model: model.GameEngine,
+        colored_tiles=None,
+        colorblind_mode: str = "normal",
+        layout: BoardLayout = None,
+    ) -> None:
         """
         Args:
             event_manager (EventManager): to post messages to
             the event queue.
             model (GameEngine): the game engine.
             colored_tiles (dict, optional): custom colored tiles based on user preferences
+            colorblind_mode (str, optional): the color palette of the tiles
+            (see PALETTES). Defaults to "normal".
+            layout (BoardLayout, optional): the position of the board on the
+            screen, shared with the controller. Defaults to None, the layout
+            of the grid size.
 
         Attributes:
             is_initialized (bool): whether the GUI is initialized
             screen (pygame.Surface): the screen surface to draw to
             clock (pygame.time.Clock): the game clock
             game_font (pygame.freetype.Font): the game font to render text
+            text_cache (utils.TextCache): the rendered texts of the game font
+            overlay_font (pygame.freetype.Font): the font of the profiler overlay
+            overlay_cache (utils.TextCache): the rendered texts of the overlay font
             tiles (dict): the tiles sprites
             colors (list): the colors to use for the tiles
             grid_gui (list): the grid of tiles
             custom_colored_tiles (dict): custom colored tiles from user selection
+            colorblind_mode (str): the color palette of the tiles
+            layout (BoardLayout): the position of the board on the screen
+            hud_rects (dict): the screen area of the HUD texts, by text
+            hud_texts (dict): the last drawn HUD texts, by text
+            profiler (FrameProfiler): the draw times of the last frames
+            show_profiler (bool): whether the profiler overlay is shown
+            profiler_drawn (int): pygame ticks when the overlay was last drawn
         """
 
         self.event_manager = event_manager
-        self.event_manager.register_listener(self)
+        self.event_manager.subscribe(InitEvent, self.on_init)
+        self.event_manager.subscribe(QuitEvent, self.on_quit)
+        self.event_manager.subscribe(TickEvent, self.on_tick)
+        self.event_manager.subscribe(ProfilerEvent, self.on_profiler)
+        self.event_manager.subscribe(ScrollEvent, self.on_scroll)
         self.model = model
         self.custom_colored_tiles = colored_tiles
+        self.colorblind_mode = colorblind_mode
+        self.layout = layout or BoardLayout(model.grid.rows, model.grid.cols)
 
         self.is_initialized = False
         self.screen = None
         self.clock = None
         self.game_font = None
+        self.text_cache = None
+        self.overlay_font = None
+        self.overlay_cache = None
         self.tiles = {}
         self.colors = []
         self.grid_gui = []
+        self.hud_rects = {}
+        self.hud_texts = {}
+        self.profiler = FrameProfiler()
+        self.show_profiler = False
+        self.profiler_drawn = 0
+
+    def on_init(self, event: InitEvent) -> None:
+        self.initialize()
+
+    def on_quit(self, event: QuitEvent) -> None:
+        self.is_initialized = False
+        pg.quit()
+
+    def on_tick(self, event: TickEvent) -> None:
+        self.draw()
+        self.clock.tick(config.FPS)
+
+    def on_profiler(self, event: ProfilerEvent) -> None:
+        self.show_profiler = not self.show_profiler
+        self.redraw()
 
-    def notify(self, event: Event) -> None:
-        if isinstance(event, InitEvent):
-            self.initialize()
-        elif isinstance(event, QuitEvent):
-            self.is_initialized = False
-            pg.quit()
-        elif isinstance(event, TickEvent):
-            self.draw()
-            self.clock.tick(config.FPS)
+    def on_scroll(self, event: ScrollEvent) -> None:
+        if self.layout.scroll(event.dx, event.dy):
+            self.redraw()
 
     def draw(self) -> None:
         """
-        Draw the game state to the screen.
+        Draw the changes of the game state to the screen. Only the tiles whose
+        state changed and the HUD texts whose value changed are drawn, so
+        frames where nothing changed don't touch the screen. Tiles outside
+        the viewport are skipped, they are drawn when scrolled into view.
         """
 
         if not self.is_initialized:
             return
+        self.profiler.start_frame()
 
-        # Clear the screen
-        self.screen.fill((0, 0, 0))
+        # Update the state of the changed tiles
+        tiles = []
+        rows, cols = self.layout.visible_tiles()
+        for row, col in self.model.grid.pop_changed_cells():
+            if row not in rows or col not in cols:
+                continue
+            tile = self.grid_gui[row][col]
+            tile.state = self.model.grid.grid[row][col]
+            tile.update()
+            tiles.append(tile)
+        self.profiler.mark("sync")
 
-        # Update the state and draw the grid
-        for row in range(self.model.grid.rows):
-            for col in range(self.model.grid.cols):
-                self.grid_gui[row][col].state = self.model.grid.grid[row][col]
-                self.grid_gui[row][col].update()
-                self.screen.blit(
-                    self.grid_gui[row][col].image, self.grid_gui[row][col].rect
-                )
+        # Draw the changed tiles, clipped to the viewport
+        rects = []
+        self.screen.set_clip(self.layout.viewport)
+        for tile in tiles:
+            self.screen.blit(tile.image, tile.rect)
+            rects.append(tile.rect.clip(self.layout.viewport))
+        self.screen.set_clip(None)
+        self.profiler.mark("blit")
 
         # Draw the progress top left
-        text_surface, _ = self.game_font.render(
-            f"Progress: {self.model.grid.progress():.2%}", (255, 255, 255)
+        rects += self.draw_text(
+            "progress", f"Progress: {self.model.grid.progress():.2%}", "left"
         )
-        self.screen.blit(text_surface, (config.MARGIN, config.MARGIN))
 
         # Draw the moves top right
-        text_surface, text_rect = self.game_font.render(
-            f"Moves: {self.model.grid.moves}", (255, 255, 255)
-        )
-        self.screen.blit(
-            text_surface,
-            (config.WIDTH - text_rect.width - config.MARGIN, config.MARGIN),
+        rects += self.draw_text("moves", f"Moves: {self.model.grid.moves}", "right")
+
+        # Draw the section times top center, refreshed every PROFILER_REFRESH ms
+        if (
+            self.show_profiler
+            and pg.time.get_ticks() - self.profiler_drawn >= config.PROFILER_REFRESH
+        ):
+            rects += self.draw_profiler()
+        self.profiler.mark("text")
+
+        if rects:
+            pg.display.update(rects)
+        self.profiler.mark("flip")
+        self.profiler.end_frame()
+
+    def draw_profiler(self) -> list:
+        """
+        Draw the p50 / p95 / p99 times in ms of every section of the
+        profiler and of the whole frame, as in its report, a line each
+        at the top center of the screen.
+
+        Returns:
+            list: the screen areas that changed
+        """
+
+        self.profiler_drawn = pg.time.get_ticks()
+        sections = FrameProfiler.SECTIONS + ("frame",)
+        # The lines fill the space above the board
+        line_height = config.FONT_SIZE // 2
+        hud_height = config.FONT_SIZE + config.MARGIN * 2
+        top = (hud_height - line_height * len(sections)) // 2
+
+        rects = []
+        for i, section in enumerate(sections):
+            p50, p95, p99 = self.profiler.percentiles(section)
+            rects += self.draw_text(
+                f"profiler_{section}",
+                f"{section} {p50:.2f}/{p95:.2f}/{p99:.2f}",
+                "center",
+                self.overlay_cache,
+                top + i * line_height,
+            )
+        return rects
+
+    def redraw(self) -> None:
+        """
+        Draw the whole game state to the screen.
+        """
+
+        if not self.is_initialized:
+            return
+
+        # Clear the screen
+        self.screen.fill((0, 0, 0))
+        self.hud_texts = {}
+        self.hud_rects = {}
+
+        # Every visible tile is drawn, so the changes so far are already drawn
+        self.model.grid.pop_changed_cells()
+        rows, cols = self.layout.visible_tiles()
+        self.screen.set_clip(self.layout.viewport)
+        for row in rows:
+            for col in cols:
+                tile = self.grid_gui[row][col]
+                tile.state = self.model.grid.grid[row][col]
+                tile.update()
+                self.screen.blit(tile.image, tile.rect)
+        self.screen.set_clip(None)
+
+        self.draw_text(
+            "progress", f"Progress: {self.model.grid.progress():.2%}", "left"
         )
+        self.draw_text("moves", f"Moves: {self.model.grid.moves}", "right")
+        if self.show_profiler:
+            self.draw_profiler()
 
         pg.display.flip()
 
+    def draw_text(
+        self,
+        key: str,
+        text: str,
+        align: str,
+        text_cache: utils.TextCache = None,
+        top: int = config.MARGIN,
+    ) -> list:
+        """
+        Draw a HUD text at the top of the screen if it changed since it
+        was last drawn.
+
+        Args:
+            key (str): name of the HUD text
+            text (str): the text to draw
+            align (str): "left", "center" or "right" alignment of the text
+            on the screen
+            text_cache (utils.TextCache, optional): the rendered texts of the
+            font to draw with. Defaults to the game font.
+            top (int, optional): the y of the top of the text. Defaults to
+            MARGIN.
+
+        Returns:
+            list: the screen areas that changed
+        """
+
+        if self.hud_texts.get(key) == text:
+            return []
+
+        rects = []
+        # Clear the previous text
+        if key in self.hud_rects:
+            self.screen.fill((0, 0, 0), self.hud_rects[key])
+            rects.append(self.hud_rects[key])
+
+        # An empty cache is falsy, so it is compared to None
+        if text_cache is None:
+            text_cache = self.text_cache
+        text_surface, _ = text_cache.get(text, (255, 255, 255))
+        text_rect = text_surface.get_rect()
+        if align == "left":
+            text_rect.topleft = (config.MARGIN, top)
+        elif align == "center":
+            text_rect.midtop = (self.layout.width // 2, top)
+        else:
+            text_rect.topleft = (
+                self.layout.width - text_rect.width - config.MARGIN,
+                top,
+            )
+        self.screen.blit(text_surface, text_rect)
+        rects.append(text_rect)
+
+        self.hud_texts[key] = text
+        self.hud_rects[key] = text_rect
+        return rects
+
     def load_resources(self):
         """Load tile resources - either default or custom colored tiles"""
         if self.custom_colored_tiles:
             # Use custom colored tiles provided by the user
             self.tiles = self.custom_colored_tiles
         else:
-            # Load default tiles
-            self.tiles = utils.load_tiles()
+            # Tint the tiles with the palette of the colorblind mode
+            self.tiles = graphics.load_tiles(
+                config.PALETTES[self.colorblind_mode], self.layout.tile_size
+            )
             
         # Generate color list
         self.colors = utils.randomize_colors(self.model.grid.qpoints)
@@ -143,13 +335,26 @@ class GameView(Listener):
 
         pg.init()
         pgft.init()
-        self.screen = pg.display.set_mode((config.WIDTH, config.HEIGHT))
+        # The window can't be larger than the desktop, so the board
+        # scrolls on small displays
+        desktop = pg.display.get_desktop_sizes()[0]
+        if self.layout.width > desktop[0] or self.layout.height > desktop[1]:
+            self.layout.fit(
+                (min(self.layout.width, desktop[0]), min(self.layout.height, desktop[1]))
+            )
+        self.screen = pg.display.set_mode((self.layout.width, self.layout.height))
         pg.display.set_caption(config.TITLE)
         self.clock = pg.time.Clock()
         self.game_font = pgft.Font(
             os.path.join(config.ASSETS_DIR, "fonts", config.FONT_FAMILY),
             config.FONT_SIZE,
         )
+        self.text_cache = utils.TextCache(self.game_font.render)
+        self.overlay_font = pgft.Font(
+            os.path.join(config.ASSETS_DIR, "fonts", config.FONT_FAMILY),
+            config.FONT_SIZE // 2,
+        )
+        self.overlay_cache = utils.TextCache(self.overlay_font.render)
 
         # Load tiles (custom or default)
         self.load_resources()
@@ -161,10 +366,12 @@ class GameView(Listener):
                     Tile(
                         self.tiles,
                         self.colors,
+                        self.layout,
                         row,
                         col,
                         self.model.grid.grid[row][col],
                     )
                 )
 
-        self.is_initialized = True
\ No newline at end of file
+        self.is_initialized = True
+        self.redraw()
\ No newline at end of file
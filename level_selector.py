@@ -1,8 +1,21 @@
 import os
 import pygame
 from pygame.locals import *
+from components.thumbnails import ThumbnailCache
 from utils import config, utils
 
+# Milliseconds an error message is shown
+ERROR_TIME = 1500
+
+# Colors
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GRAY = (200, 200, 200)
+BLUE = (0, 120, 255)
+
+# Event posted by the thumbnails thread when a thumbnail is rendered
+THUMBNAIL_RENDERED = pygame.event.custom_type()
+
 class GameOptions:
     """A class to replace command line arguments"""
     def __init__(self):
@@ -15,6 +28,7 @@ class GameOptions:
         self.cols = None
         self.points = None
         self.colorblind_mode = "normal"  # Options: "normal", "protanopia", "deuteranopia", "tritanopia"
+        self.record = None  # File to record the input events to
 
 
 def level_selection_screen():
@@ -25,19 +39,13 @@ def level_selection_screen():
 
     # Load levels
     try:
-        levels = utils.load_grid_config(os.path.join(config.DATA_DIR, "levels.json"))
+        levels = utils.load_level_pack(os.path.join(config.DATA_DIR, "levels.json"))
         total_levels = len(levels)
     except Exception as e:
         print(f"Error loading levels: {e}")
         pygame.quit()
         return None
 
-    # Colors
-    WHITE = (255, 255, 255)
-    BLACK = (0, 0, 0)
-    GRAY = (200, 200, 200)
-    BLUE = (0, 120, 255)
-
     # Fonts
     font_title = pygame.font.SysFont(None, 48)
     font_text = pygame.font.SysFont(None, 36)
@@ -50,6 +58,7 @@ def level_selection_screen():
     # Buttons
     button_width, button_height = 150, 50
     start_button = pygame.Rect((600 - button_width) // 2, 380, button_width, button_height)
+    browse_button = pygame.Rect((600 - button_width) // 2, 310, button_width, 50)
 
     # Colorblind options
     cb_options = ["normal", "protanopia", "deuteranopia", "tritanopia"]
@@ -64,43 +73,91 @@ def level_selection_screen():
     cb_button_height = 60
     cb_button = pygame.Rect((600 - cb_button_width) // 2, 230, cb_button_width, cb_button_height)
 
+    # Rendered texts, so each text is rendered once and not every frame
+    texts_title = utils.TextCache(lambda text, color: font_title.render(text, True, color))
+    texts_text = utils.TextCache(lambda text, color: font_text.render(text, True, color))
+    texts_small = utils.TextCache(lambda text, color: font_small.render(text, True, color))
+
+    # Thumbnails of the levels, created when the level browser is opened
+    thumbnails = None
+
+    def quit_screen(result):
+        if thumbnails is not None:
+            thumbnails.close()
+        pygame.quit()
+        return result
+
+    # Error message shown over the screen until error_until (in ms)
+    error_message = None
+    error_until = 0
+
+    # The screen is only drawn when something changes, at most FPS times per second
+    clock = pygame.time.Clock()
+    redraw = True
     running = True
     while running:
-        screen.fill(WHITE)
+        if redraw:
+            screen.fill(WHITE)
+
+            # Title
+            title = texts_title.get("Level Selection", BLACK)
+            screen.blit(title, ((600 - title.get_width()) // 2, 30))
 
-        # Title
-        title = font_title.render("Level Selection", True, BLACK)
-        screen.blit(title, ((600 - title.get_width()) // 2, 30))
+            # Level prompt
+            level_prompt = texts_text.get(f"Choose Level (1-{total_levels}):", BLACK)
+            screen.blit(level_prompt, (100, 100))
 
-        # Level prompt
-        level_prompt = font_text.render(f"Choose Level (1-{total_levels}):", True, BLACK)
-        screen.blit(level_prompt, (100, 100))
+            # Level input box
+            pygame.draw.rect(screen, BLUE if input_active else GRAY, (350, 100, 150, 40), 2)
+            input_surface = texts_text.get(input_text, BLACK)
+            screen.blit(input_surface, (360, 105))
 
-        # Level input box
-        pygame.draw.rect(screen, BLUE if input_active else GRAY, (350, 100, 150, 40), 2)
-        input_surface = font_text.render(input_text, True, BLACK)
-        screen.blit(input_surface, (360, 105))
+            # Error message
+            if error_message:
+                error_text = texts_small.get(error_message, (255, 0, 0))
+                screen.blit(error_text, (250, 150))
 
-        # Colorblind mode selector (larger)
-        pygame.draw.rect(screen, BLUE, cb_button)
-        cb_text = font_small.render(f"Vision Mode: {cb_labels[cb_options[cb_index]]}", True, WHITE)
-        screen.blit(cb_text, (cb_button.x + (cb_button_width - cb_text.get_width()) // 2,
-                              cb_button.y + (cb_button_height - cb_text.get_height()) // 2))
+            # Colorblind mode selector (larger)
+            pygame.draw.rect(screen, BLUE, cb_button)
+            cb_text = texts_small.get(f"Vision Mode: {cb_labels[cb_options[cb_index]]}", WHITE)
+            screen.blit(cb_text, (cb_button.x + (cb_button_width - cb_text.get_width()) // 2,
+                                  cb_button.y + (cb_button_height - cb_text.get_height()) // 2))
 
-        # Start button
-        pygame.draw.rect(screen, BLUE, start_button)
-        start_text = font_text.render("Start Game", True, WHITE)
-        screen.blit(start_text, (start_button.x + (button_width - start_text.get_width()) // 2,
-                                 start_button.y + (button_height - start_text.get_height()) // 2))
+            # Browse button
+            pygame.draw.rect(screen, BLUE, browse_button)
+            browse_text = texts_small.get("Browse Levels", WHITE)
+            screen.blit(browse_text, (browse_button.x + (button_width - browse_text.get_width()) // 2,
+                                      browse_button.y + (browse_button.height - browse_text.get_height()) // 2))
 
-        pygame.display.flip()
+            # Start button
+            pygame.draw.rect(screen, BLUE, start_button)
+            start_text = texts_text.get("Start Game", WHITE)
+            screen.blit(start_text, (start_button.x + (button_width - start_text.get_width()) // 2,
+                                     start_button.y + (button_height - start_text.get_height()) // 2))
 
-        for event in pygame.event.get():
+            pygame.display.flip()
+            redraw = False
+            clock.tick(config.FPS)
+
+        # Wait for input, or until the error message must be hidden
+        timeout = config.IDLE_TIMEOUT
+        if error_message:
+            timeout = max(1, min(timeout, error_until - pygame.time.get_ticks()))
+        events = [pygame.event.wait(timeout)] + pygame.event.get()
+
+        if error_message and pygame.time.get_ticks() >= error_until:
+            error_message = None
+            redraw = True
+
+        for event in events:
             if event.type == QUIT:
-                pygame.quit()
-                return None
+                return quit_screen(None)
+
+            elif event.type in (VIDEOEXPOSE, WINDOWEXPOSED):
+                redraw = True
 
             elif event.type == MOUSEBUTTONDOWN:
+                redraw = True
                 if pygame.Rect(350, 100, 150, 40).collidepoint(event.pos):
                     input_active = True
                 else:
@@ -109,6 +166,23 @@ def level_selection_screen():
                 if cb_button.collidepoint(event.pos):
                     cb_index = (cb_index + 1) % len(cb_options)
 
+                if browse_button.collidepoint(event.pos):
+                    # The thumbnails are drawn with the colors of the vision mode
+                    palette = config.PALETTES[cb_options[cb_index]]
+                    if thumbnails is None or thumbnails.colors != list(palette.values()):
+                        if thumbnails is not None:
+                            thumbnails.close()
+                        thumbnails = ThumbnailCache(
+                            levels, palette, on_rendered=lambda index: pygame.event.post(pygame.event.Event(THUMBNAIL_RENDERED))
+                        )
+                    try:
+                        current_level = int(input_text)
+                    except ValueError:
+                        current_level = 1
+                    level = level_browser_screen(screen, thumbnails, texts_title, texts_small, current_level)
+                    if level is not None:
+                        input_text = str(level)
+
                 if start_button.collidepoint(event.pos):
                     options = GameOptions()
                     try:
@@ -117,30 +191,118 @@ def level_selection_screen():
                             options.level = level_num
                             options.colorblind_mode = cb_options[cb_index]
                         else:
-                            error_font = pygame.font.SysFont(None, 24)
-                            error_text = error_font.render(f"Level must be between 1 and {total_levels}", True, (255, 0, 0))
-                            screen.blit(error_text, (250, 150))
-                            pygame.display.flip()
-                            pygame.time.wait(1500)
+                            error_message = f"Level must be between 1 and {total_levels}"
+                            error_until = pygame.time.get_ticks() + ERROR_TIME
                             continue
                     except ValueError:
-                        error_font = pygame.font.SysFont(None, 24)
-                        error_text = error_font.render("Please enter a valid level number", True, (255, 0, 0))
-                        screen.blit(error_text, (250, 150))
-                        pygame.display.flip()
-                        pygame.time.wait(1500)
+                        error_message = "Please enter a valid level number"
+                        error_until = pygame.time.get_ticks() + ERROR_TIME
                         continue
 
-                    pygame.quit()
-                    return options
+                    return quit_screen(options)
 
             elif event.type == KEYDOWN:
                 if input_active:
                     if event.key == K_BACKSPACE:
                         input_text = input_text[:-1]
+                        redraw = True
                     elif event.unicode.isdigit():
                         input_text += event.unicode
+                        redraw = True
+
+    return quit_screen(None)
 
-    pygame.quit()
-    return None
 
+def level_browser_screen(screen, thumbnails, texts_title, texts_small, selected_level):
+    """Display pages of level thumbnails and return the clicked level, or None
+    if the browser is closed. Only the thumbnails of the shown pages are
+    rendered, in the background, so changing pages never waits for them"""
+    total_levels = len(thumbnails.levels)
+    per_page = config.BROWSER_COLS * config.BROWSER_ROWS
+    total_pages = max(1, (total_levels + per_page - 1) // per_page)
+    page = min(max(selected_level - 1, 0) // per_page, total_pages - 1)
+
+    size = config.THUMBNAIL_SIZE
+    gap_x = (600 - config.BROWSER_COLS * size) // (config.BROWSER_COLS + 1)
+    gap_y = 34
+
+    def thumbnail_rect(slot):
+        row, col = divmod(slot, config.BROWSER_COLS)
+        return pygame.Rect(gap_x + col * (size + gap_x), 70 + row * (size + gap_y), size, size)
+
+    def page_levels(page):
+        return range(max(page * per_page, 0), min((page + 1) * per_page, total_levels))
+
+    clock = pygame.time.Clock()
+    redraw = True
+    missing = False
+    requested_page = None
+    while True:
+        if page != requested_page:
+            # The shown page first, then its neighbours so they are ready
+            thumbnails.request([*page_levels(page), *page_levels(page + 1), *page_levels(page - 1)])
+            requested_page = page
+
+        if redraw:
+            missing = False
+            screen.fill(WHITE)
+
+            title = texts_title.get("Levels", BLACK)
+            screen.blit(title, ((600 - title.get_width()) // 2, 20))
+
+            for slot, index in enumerate(page_levels(page)):
+                rect = thumbnail_rect(slot)
+                thumbnail = thumbnails.get(index)
+                if thumbnail is None:
+                    missing = True
+                    pygame.draw.rect(screen, GRAY, rect)
+                else:
+                    screen.blit(thumbnail, rect)
+                if index + 1 == selected_level:
+                    pygame.draw.rect(screen, BLUE, rect.inflate(6, 6), 3)
+                label = texts_small.get(str(index + 1), BLACK)
+                screen.blit(label, (rect.centerx - label.get_width() // 2, rect.bottom + 6))
+
+            footer = texts_small.get(f"Page {page + 1}/{total_pages}  -  Left/Right: change page, Esc: back", BLACK)
+            screen.blit(footer, ((600 - footer.get_width()) // 2, 450))
+
+            pygame.display.flip()
+            redraw = False
+            clock.tick(config.FPS)
+
+        # Wait for input, or for the missing thumbnails of the page
+        timeout = 1000 // config.FPS if missing else config.IDLE_TIMEOUT
+        events = [pygame.event.wait(timeout)] + pygame.event.get()
+        if missing:
+            redraw = True
+
+        for event in events:
+            if event.type == QUIT:
+                # The level selection screen quits
+                pygame.event.post(event)
+                return None
+
+            elif event.type in (VIDEOEXPOSE, WINDOWEXPOSED, THUMBNAIL_RENDERED):
+                redraw = True
+
+            elif event.type == MOUSEWHEEL:
+                page = min(max(page - event.y, 0), total_pages - 1)
+                redraw = True
+
+            elif event.type == MOUSEBUTTONDOWN and event.button == 1:
+                for slot, index in enumerate(page_levels(page)):
+                    if thumbnail_rect(slot).collidepoint(event.pos):
+                        return index + 1
+
+            elif event.type == KEYDOWN:
+                if event.key == K_ESCAPE:
+                    return None
+                elif event.key in (K_LEFT, K_PAGEUP):
+                    page = max(page - 1, 0)
+                elif event.key in (K_RIGHT, K_PAGEDOWN):
+                    page = min(page + 1, total_pages - 1)
+                elif event.key == K_HOME:
+                    page = 0
+                elif event.key == K_END:
+                    page = total_pages - 1
+                redraw = True
@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 
@@ -5,7 +6,8 @@ os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
 
 from components.grid import Grid as Grid
 from components.solver import Solver as Solver
-from components import eventmanager, model, controller, view
+from components import eventmanager, model, controller, view, replay, hint
+from components.layout import BoardLayout
 from utils import config, utils
 from level_selector import level_selection_screen
 
@@ -13,7 +15,7 @@ from level_selector import level_selection_screen
 def run_game(options):
     """Run the game with the given options"""
     try:
-        levels = utils.load_grid_config(os.path.join(config.DATA_DIR, "levels.json"))
+        levels = utils.load_level_pack(os.path.join(config.DATA_DIR, "levels.json"))
     except Exception as e:
         print(f"Error loading levels: {e}")
         return False
@@ -58,18 +60,37 @@ def run_game(options):
 
     event_manager = eventmanager.EventManager()
     gamemodel = model.GameEngine(event_manager, grid)
-    gamecontroller = controller.GameController(event_manager, gamemodel)
-    gameview = view.GameView(event_manager, gamemodel)
+    if options.record:
+        replay.Recorder(event_manager, gamemodel, options.record)
+    # The view and the controller share where the board is on the screen
+    layout = BoardLayout(grid.rows, grid.cols)
+    gamecontroller = controller.GameController(event_manager, gamemodel, layout)
+    hint.HintEngine(event_manager, gamemodel, on_solved=controller.post_hint_solved)
+    gameview = view.GameView(
+        event_manager,
+        gamemodel,
+        colorblind_mode=options.colorblind_mode,
+        layout=layout,
+    )
     gamemodel.run()
     return True
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flow game")
+    parser.add_argument(
+        "--record",
+        metavar="FILE",
+        help="record the input events of the game to FILE (see run_replay_experiment.py)",
+    )
+    args = parser.parse_args()
+
     # Show level selection screen
     options = level_selection_screen()
     
     # If options were returned, run the game
     if options:
+        options.record = args.record
         run_game(options)
     else:
         print("Game cancelled")
\ No newline at end of file
@@ -0,0 +1,61 @@
+import os, sys, time
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+
+from components.eventmanager import *
+from components.grid import Grid as Grid
+from components.model import GameEngine as GameEngine
+from utils import config, utils
+
+
+class CountListener(Listener):
+    """Catch-all listener that counts the events it is notified of."""
+
+    def __init__(self, event_manager: EventManager) -> None:
+        self.event_manager = event_manager
+        self.event_manager.register_listener(self)
+        self.count = 0
+
+    def notify(self, event: Event) -> None:
+        self.count += 1
+
+
+def events_per_second(event_manager: EventManager, make_event, run_times: int) -> float:
+    """Post run_times events created by make_event and return the
+    throughput in events per second."""
+
+    start = time.perf_counter()
+    for _ in range(run_times):
+        event_manager.post(make_event())
+    return run_times / (time.perf_counter() - start)
+
+
+def main(argv):
+    run_times = int(argv[1]) if len(argv) > 1 else 200000
+
+    try:
+        levels = utils.load_grid_config(os.path.join(config.DATA_DIR, "levels.json"))
+    except Exception as e:
+        print(e)
+        sys.exit(1)
+
+    # The game engine handles the tile events like in the game, the
+    # listener stands for a view or controller that sees every event
+    event_manager = EventManager()
+    GameEngine(event_manager, Grid.from_config(levels[0]))
+    CountListener(event_manager)
+
+    benchmarks = {
+        "tick": TickEvent,
+        "quit": QuitEvent,
+        "tile_released": TileReleasedEvent,
+        # Hovering outside the grid, so the engine does no grid work
+        "tile_hovered": lambda: TileHoveredEvent((-1, -1)),
+    }
+    for name, make_event in benchmarks.items():
+        throughput = events_per_second(event_manager, make_event, run_times)
+        print(f"{name}: {throughput:,.0f} events/s")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,160 @@
+import argparse, os, statistics, sys, threading, time
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+
+from components.eventmanager import *
+from components.grid import Grid as Grid
+from components.hint import HintEngine, FREE
+from components.model import GameEngine as GameEngine
+from components.solver import Solver as Solver
+from run_path_experiment import UNSOLVED_LEVELS
+from utils import config, utils
+
+
+def start_game(grid_config: dict, timeout: float) -> tuple:
+    """Start a game with a hint engine, like main.py without the view and
+    the controller. The event stands for the pygame event that wakes the
+    game loop when a hint solve ends."""
+
+    event_manager = EventManager()
+    gamemodel = GameEngine(event_manager, Grid.from_config(grid_config))
+    solved = threading.Event()
+    engine = HintEngine(event_manager, gamemodel, timeout, on_solved=solved.set)
+    event_manager.post(InitEvent())
+    return event_manager, gamemodel, engine, solved
+
+
+def wait_precompute(engine: HintEngine, solved: threading.Event) -> None:
+    """Wait until the solution without the player's paths is solved."""
+
+    while FREE not in engine._solutions:
+        solved.wait()
+        solved.clear()
+
+
+def hint_latency(event_manager: EventManager, engine, solved) -> tuple:
+    """Press the hint key and post a HintReadyEvent whenever a hint solve
+    ends, as the game loop would, until the hint is given. Return the time
+    the game loop was blocked by the hint handlers and the time until the
+    hint was given, in ms."""
+
+    start = time.perf_counter()
+    event_manager.post(HintEvent())
+    blocked = time.perf_counter() - start
+    while engine.solving:
+        solved.wait()
+        solved.clear()
+        handled = time.perf_counter()
+        event_manager.post(HintReadyEvent())
+        blocked += time.perf_counter() - handled
+    return blocked * 1000, (time.perf_counter() - start) * 1000
+
+
+def conflicting_path(grid: Grid, solution: list) -> tuple[int, list] | None:
+    """Find a complete path that a player could draw but the solution
+    doesn't have: the shortest path of a point-pair on the empty grid."""
+
+    solver = Solver(Grid(grid.rows, grid.cols, grid.qpoints, grid.points))
+    for point, path in enumerate(solution):
+        shortest = solver._solve_point(point)
+        if shortest and shortest != path and shortest[::-1] != path:
+            return point, shortest
+    return None
+
+
+def run_scenarios(grid_config: dict, timeout: float) -> dict:
+    """Measure the hint latencies of a grid: a hint pressed as the game
+    starts, after the first solve ended, again right after and with a
+    conflicting complete path of the player.
+
+    Returns:
+        dict: (blocked ms, latency ms) of every scenario, by name
+    """
+
+    results = {}
+    event_manager, _, engine, solved = start_game(grid_config, timeout)
+    results["at start"] = hint_latency(event_manager, engine, solved)
+    engine.close()
+
+    event_manager, gamemodel, engine, solved = start_game(grid_config, timeout)
+    wait_precompute(engine, solved)
+    results["first"] = hint_latency(event_manager, engine, solved)
+    results["repeated"] = hint_latency(event_manager, engine, solved)
+
+    solution = engine.solution
+    if solution is not None:
+        gamemodel.grid.restart()
+        conflict = conflicting_path(gamemodel.grid, solution)
+        if conflict is not None:
+            gamemodel.grid.apply_path(*conflict)
+            results["conflict"] = hint_latency(event_manager, engine, solved)
+    engine.close()
+    return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Measure the latency of the hints")
+    parser.add_argument(
+        "-l", "--level", type=int, nargs="+", help="levels to use"
+    )
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        type=int,
+        nargs="+",
+        help="sides of square grids with a solution to use instead of levels",
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        default=config.HINT_TIMEOUT,
+        help="seconds per hint solve",
+    )
+    args = parser.parse_args(argv[1:])
+
+    grids = []
+    if args.sizes:
+        # The scaling experiment imports pygame, only needed for its grids
+        from run_scaling_experiment import snake_config
+
+        for size in args.sizes:
+            grid_config, _ = snake_config(size, size, min(config.MAX_POINTS, size))
+            grids.append((f"{size}x{size}", grid_config))
+    else:
+        try:
+            levels = utils.load_level_pack(os.path.join(config.DATA_DIR, "levels.json"))
+        except Exception as e:
+            print(e)
+            sys.exit(1)
+        chosen = args.level or [
+            level for level in range(1, len(levels) + 1) if level not in UNSOLVED_LEVELS
+        ]
+        for level in chosen:
+            grid_config = levels[level - 1]
+            name = f"Level {level} ({grid_config['rows']}x{grid_config['cols']})"
+            grids.append((name, grid_config))
+
+    totals = {}
+    for name, grid_config in grids:
+        results = run_scenarios(grid_config, args.timeout)
+        print(f"{name}:")
+        for scenario, (blocked, latency) in results.items():
+            totals.setdefault(scenario, []).append((blocked, latency))
+            print(
+                f"\t{scenario}: blocked {blocked:.2f} ms, hint in {latency:.2f} ms"
+            )
+
+    print("\nMedian / max:")
+    for scenario, values in totals.items():
+        blocked = [value[0] for value in values]
+        latency = [value[1] for value in values]
+        print(
+            f"\t{scenario}: blocked {statistics.median(blocked):.2f}",
+            f"/ {max(blocked):.2f} ms,",
+            f"hint in {statistics.median(latency):.2f} / {max(latency):.2f} ms",
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv)
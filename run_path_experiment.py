@@ -0,0 +1,91 @@
+import os, sys, time
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+
+from components.grid import Grid as Grid
+from components.solver import Solver as Solver
+from utils import config, utils
+
+# Levels the solver can't solve (see README), they may take minutes
+UNSOLVED_LEVELS = (17, 19, 20, 22, 24)
+
+
+def solved_paths(grid: Grid) -> list:
+    """Solve the grid and return the path of every point-pair."""
+
+    grid.restart()
+    if not Solver(grid).solve():
+        return []
+    return [list(grid._paths[point + 1]) for point in range(grid.qpoints)]
+
+
+def time_add_path(grid: Grid, paths: list, run_times: int) -> float:
+    """Apply the paths run_times times with remove_path / add_path, the
+    same way the solver used to, and return the total time."""
+
+    start = time.perf_counter()
+    for _ in range(run_times):
+        for point, path in enumerate(paths):
+            grid.remove_path(point)
+            grid.add_path(path)
+    return time.perf_counter() - start
+
+
+def time_apply_path(grid: Grid, paths: list, run_times: int) -> float:
+    """Apply the paths run_times times with clear_path / apply_path and
+    return the total time."""
+
+    start = time.perf_counter()
+    for _ in range(run_times):
+        for point, path in enumerate(paths):
+            grid.clear_path(point)
+            grid.apply_path(point, path)
+    return time.perf_counter() - start
+
+
+def main(argv):
+    run_times = int(argv[1]) if len(argv) > 1 else 1000
+
+    try:
+        levels = utils.load_grid_config(os.path.join(config.DATA_DIR, "levels.json"))
+    except Exception as e:
+        print(e)
+        sys.exit(1)
+
+    total_add, total_apply = 0.0, 0.0
+    for i, grid_config in enumerate(levels):
+        if i + 1 in UNSOLVED_LEVELS:
+            continue
+        grid = Grid.from_config(grid_config)
+        paths = solved_paths(grid)
+        if not paths:
+            continue
+
+        grid.restart()
+        add_time = time_add_path(grid, paths, run_times)
+        expected = [list(row) for row in grid.grid]
+
+        grid.restart()
+        apply_time = time_apply_path(grid, paths, run_times)
+        if grid.grid != expected:
+            print(f"Level {i + 1}: apply_path produced a different grid!")
+            sys.exit(1)
+
+        total_add += add_time
+        total_apply += apply_time
+        print(
+            f"Level {i + 1} ({grid.rows}x{grid.cols}):",
+            f"add_path {add_time * 1000:.2f} ms,",
+            f"apply_path {apply_time * 1000:.2f} ms,",
+            f"speedup {add_time / apply_time:.2f}x",
+        )
+
+    print(
+        f"\nTotal: add_path {total_add * 1000:.2f} ms,",
+        f"apply_path {total_apply * 1000:.2f} ms,",
+        f"speedup {total_add / total_apply:.2f}x",
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv)
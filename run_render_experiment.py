@@ -0,0 +1,130 @@
+import argparse, os, random, sys
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+# Render without a display unless another video driver is requested
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from components.grid import Grid as Grid
+from components.solver import Solver as Solver
+from components import eventmanager, model, view
+from components.profiler import FrameProfiler
+from utils import config, utils
+
+
+def solved_paths(grid: Grid) -> list:
+    """Solve the grid and return the path of every point-pair, or
+    an empty list if the solver couldn't solve it."""
+
+    found_solution = Solver(grid).solve()
+    paths = [list(grid._paths[point + 1]) for point in range(grid.qpoints)]
+    grid.restart()
+    return paths if found_solution else []
+
+
+def drag_frames(grid: Grid, paths: list, frames: int):
+    """Script of a player drawing the paths, a cell per frame. The grid
+    restarts after every path is drawn."""
+
+    frame = 0
+    while True:
+        for point, path in enumerate(paths):
+            grid.start_path(*path[0])
+            for cell in path[1:]:
+                grid.continue_path(*cell)
+                yield
+                frame += 1
+                if frame >= frames:
+                    return
+            grid.end_path()
+        grid.restart()
+
+
+def full_frames(grid: Grid, frames: int):
+    """Script where every cell of the grid changes every frame."""
+
+    for _ in range(frames):
+        grid.restart()
+        yield
+
+
+def idle_frames(grid: Grid, frames: int):
+    """Script where nothing changes."""
+
+    for _ in range(frames):
+        yield
+
+
+def render(
+    grid: Grid, script, frames: int, show_profiler: bool = False
+) -> view.GameView:
+    """Draw a frame for every step of the script and return the view,
+    whose profiler has the frame times."""
+
+    event_manager = eventmanager.EventManager()
+    gamemodel = model.GameEngine(event_manager, grid)
+    gameview = view.GameView(event_manager, gamemodel)
+    event_manager.post(eventmanager.InitEvent())
+    gameview.show_profiler = show_profiler
+    # Don't count the frames of the initialization
+    gameview.profiler = FrameProfiler(frames)
+
+    for _ in script:
+        gameview.draw()
+
+    event_manager.post(eventmanager.QuitEvent())
+    return gameview
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Measure the frame times of the game")
+    parser.add_argument(
+        "-n", "--frames", type=int, default=2000, help="frames per board"
+    )
+    parser.add_argument(
+        "-l", "--level", type=int, default=25, help="level to draw the solution of"
+    )
+    parser.add_argument(
+        "--overlay", action="store_true", help="draw the profiler overlay"
+    )
+    args = parser.parse_args(argv[1:])
+
+    random.seed(0)
+    try:
+        levels = utils.load_grid_config(os.path.join(config.DATA_DIR, "levels.json"))
+    except Exception as e:
+        print(e)
+        sys.exit(1)
+
+    level_grid = Grid.from_config(levels[args.level - 1])
+    paths = solved_paths(level_grid)
+    # 9x9 board with every color, so the sprites of all colors are drawn
+    # (see run_scaling_experiment.py for larger boards)
+    full_grid = Grid.from_config(Grid.create_random_config(9, 9, config.MAX_POINTS))
+
+    boards = {
+        f"idle (level {args.level})": (
+            level_grid,
+            idle_frames(level_grid, args.frames),
+        ),
+        f"full redraw ({full_grid.rows}x{full_grid.cols}, {full_grid.qpoints} colors)": (
+            full_grid,
+            full_frames(full_grid, args.frames),
+        ),
+    }
+    if paths:
+        boards[f"drag (level {args.level})"] = (
+            level_grid,
+            drag_frames(level_grid, paths, args.frames),
+        )
+    else:
+        print(f"The solver couldn't solve level {args.level}, skipping drag\n")
+
+    for name, (grid, script) in boards.items():
+        gameview = render(grid, script, args.frames, args.overlay)
+        print(f"{name}, {gameview.profiler.frames} frames:")
+        print(gameview.profiler.report())
+        print()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,98 @@
+import argparse, os, sys
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+
+from components.grid import Grid as Grid
+from components.solver import Solver as Solver
+from components import replay
+from utils import config, utils
+
+
+def synthesize_recording(file: str, level: int, repetitions: int) -> None:
+    """Write a recording of a player drawing the solution of a level
+    repetitions times, restarting the grid between repetitions. Every
+    path is drawn forward, partially undone and drawn again."""
+
+    levels = utils.load_grid_config(os.path.join(config.DATA_DIR, "levels.json"))
+    grid = Grid.from_config(levels[level - 1])
+    if not Solver(grid).solve():
+        print("The solver couldn't find a solution...")
+        sys.exit(1)
+    paths = [list(grid._paths[point + 1]) for point in range(grid.qpoints)]
+    grid.restart()
+
+    codes = replay.EVENT_CODES
+    records = []
+    tick = 0
+    for repetition in range(repetitions):
+        if repetition > 0:
+            tick += 1
+            records.append((tick, codes[replay.RestartEvent], 0, 0))
+        for path in paths:
+            records.append((tick, codes[replay.TilePressedEvent], *path[0]))
+            # Draw, go back halfway and draw again
+            half = len(path) // 2
+            cells = path[1:] + path[half:-1][::-1] + path[half + 1 :]
+            for cell in cells:
+                tick += 1
+                records.append((tick, codes[replay.TileHoveredEvent], *cell))
+            records.append((tick, codes[replay.TileReleasedEvent], 0, 0))
+
+    grid_config = {
+        "rows": grid.rows,
+        "cols": grid.cols,
+        "qpoints": grid.qpoints,
+        "points": grid.points,
+        "paths": [[] for _ in range(grid.qpoints)],
+    }
+    replay.save_recording(file, grid_config, records)
+    print(f"Wrote {len(records)} events to {file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded game")
+    parser.add_argument("file", help="recording file (see main.py --record)")
+    parser.add_argument(
+        "--render",
+        action="store_true",
+        help="also draw the game, with the SDL dummy video driver",
+    )
+    parser.add_argument(
+        "--synthesize",
+        metavar="LEVEL",
+        type=int,
+        help="first write a recording of drawing the solution of LEVEL to file",
+    )
+    parser.add_argument(
+        "--repetitions",
+        type=int,
+        default=100,
+        help="times the solution is drawn in a synthesized recording",
+    )
+    args = parser.parse_args()
+
+    if args.synthesize:
+        synthesize_recording(args.file, args.synthesize, args.repetitions)
+    if args.render:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    try:
+        stats = replay.replay(args.file, args.render)
+    except Exception as e:
+        print(e)
+        sys.exit(1)
+
+    print(f"Events: {stats['events']} in {stats['ticks']} ticks")
+    print(f"Events/s: {stats['events_per_second']:,.0f}")
+    print(
+        "Latency (us):",
+        f"p50 {stats['p50']:.1f},",
+        f"p95 {stats['p95']:.1f},",
+        f"p99 {stats['p99']:.1f},",
+        f"max {stats['max']:.1f}",
+    )
+    print(f"Final progress: {stats['grid'].progress():.2%}")
+
+
+if __name__ == "__main__":
+    main()
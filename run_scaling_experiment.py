@@ -0,0 +1,116 @@
+import argparse, os, random, statistics, sys, time
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+# Render without a display unless another video driver is requested
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from components.grid import Grid as Grid
+from components.solver import Solver as Solver
+from components.layout import BoardLayout
+from components.validator import validate_grid
+from run_render_experiment import render, drag_frames, full_frames
+from utils import config
+
+
+def snake_config(rows: int, cols: int, qpoints: int) -> tuple[dict, list]:
+    """Create a grid whose point-pairs are the ends of the segments of a
+    path that snakes through every cell, so the segments are a solution.
+
+    Returns:
+        tuple[dict, list]: the grid configuration and the path of every
+        point-pair
+    """
+
+    cells = [
+        (row, col if row % 2 == 0 else cols - 1 - col)
+        for row in range(rows)
+        for col in range(cols)
+    ]
+    # Every segment has at least 2 cells
+    cuts = sorted(random.sample(range(1, len(cells) // 2), qpoints - 1))
+    cuts = [cut * 2 for cut in cuts]
+    paths = [cells[start:end] for start, end in zip([0] + cuts, cuts + [len(cells)])]
+    grid_config = {
+        "rows": rows,
+        "cols": cols,
+        "qpoints": qpoints,
+        "points": [[path[0], path[-1]] for path in paths],
+    }
+    return grid_config, paths
+
+
+def time_solve(size: int, qpoints: int, grids: int, timeout: float) -> tuple:
+    """Solve grids of a size that have a solution (see snake_config) and
+    return how many were solved, how many ran out of time and the median
+    solve time. A solve that runs out of time takes the timeout. A solution
+    that isn't valid doesn't count as solved."""
+
+    solved = timed_out = 0
+    times = []
+    for _ in range(grids):
+        grid_config, _ = snake_config(size, size, qpoints)
+        grid = Grid.from_config(grid_config)
+        solver = Solver(grid)
+        start = time.perf_counter()
+        found = solver.solve(timeout=timeout)
+        times.append(min(time.perf_counter() - start, timeout))
+        solved += found and validate_grid(grid)
+        timed_out += solver.timed_out
+    return solved, timed_out, statistics.median(times)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        description="Measure how the solve and frame times grow with the grid size"
+    )
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[5, 10, 15, 20, 25, config.MAX_GRID_N],
+        help="sides of the square grids",
+    )
+    parser.add_argument(
+        "-g", "--grids", type=int, default=5, help="grids solved per size"
+    )
+    parser.add_argument(
+        "-t", "--timeout", type=float, default=2, help="seconds per solve"
+    )
+    parser.add_argument(
+        "-n", "--frames", type=int, default=500, help="frames per board"
+    )
+    args = parser.parse_args(argv[1:])
+
+    random.seed(0)
+    for size in args.sizes:
+        qpoints = min(config.MAX_POINTS, size)
+        layout = BoardLayout(size, size)
+        print(
+            f"{size}x{size}, {qpoints} points",
+            f"({layout.tile_size} px tiles, {layout.width}x{layout.height} window):",
+        )
+
+        solved, timed_out, median_time = time_solve(
+            size, qpoints, args.grids, args.timeout
+        )
+        print(
+            f"\tsolve: {solved}/{args.grids} solved,",
+            f"{args.grids - solved - timed_out} without solution found,",
+            f"{timed_out} out of time, median {median_time * 1000:.1f} ms",
+        )
+
+        grid_config, paths = snake_config(size, size, qpoints)
+        grid = Grid.from_config(grid_config)
+        for name, script in (
+            ("full redraw", full_frames(grid, args.frames)),
+            ("drag", drag_frames(grid, paths, args.frames)),
+        ):
+            gameview = render(grid, script, args.frames)
+            p50, p95, p99 = gameview.profiler.percentiles()
+            print(f"\t{name}: p50 {p50:.3f} ms, p95 {p95:.3f} ms, p99 {p99:.3f} ms")
+            grid.restart()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -4,6 +4,7 @@ os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
 
 from components.grid import Grid as Grid
 from components.solver import Solver as Solver
+from components.validator import validate_grid
 from utils import config, utils
 
 
@@ -23,6 +24,9 @@ def do_experiment(grid: Grid, run_times: int = 3) -> float:
 
         if not solved:
             return -1
+        if not validate_grid(grid):
+            print("The solver found an invalid solution!")
+            return -1
 
     return total_time / float(run_times)
 
@@ -0,0 +1,161 @@
+import argparse, json, os, random, statistics, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+
+from components.grid import Grid as Grid
+from components.solver import Solver as Solver, size_class
+from utils import config, utils
+
+# Values of the solver parameters the candidates are sampled from
+SEARCH_SPACE = {
+    "added_cost_factor": [0.25, 0.5, 1, 2, 4],
+    "max_repetitions": [50, 100, 250, 500, 1000],
+    "window_repetition": [2, 3, 4, 5],
+}
+
+
+def evaluate(params: dict, grid_config: dict, timeout: float) -> tuple[bool, float]:
+    """Solve a grid with some solver parameters and return if it was solved
+    and the time it took. A solve that runs out of time takes the timeout."""
+
+    grid = Grid.from_config(grid_config)
+    solver = Solver(grid, params)
+    start = time.perf_counter()
+    solved = solver.solve(timeout=timeout)
+    elapsed = time.perf_counter() - start
+    return solved, min(elapsed, timeout)
+
+
+def score(results: list) -> tuple[float, float]:
+    """Solve rate and median solve time of the results of a candidate."""
+
+    solve_rate = sum(solved for solved, _ in results) / len(results)
+    median_time = statistics.median(elapsed for _, elapsed in results)
+    return solve_rate, median_time
+
+
+def successive_halving(
+    executor, candidates: list, levels: list, timeout: float, eta: int
+) -> tuple[dict, tuple[float, float]]:
+    """Find the best candidate for a set of levels. Every round evaluates the
+    remaining candidates on more levels and keeps the best 1/eta of them, so
+    most of the time is spent on the most promising candidates.
+
+    Returns:
+        tuple[dict, tuple[float, float]]: the best candidate and its solve
+        rate and median solve time
+    """
+
+    # The last round runs the last eta candidates on every level
+    rounds = 1
+    while len(candidates) > eta**rounds:
+        rounds += 1
+    size = max(1, len(levels) // eta ** (rounds - 1))
+
+    while True:
+        if len(candidates) <= eta:
+            size = len(levels)
+        rung = levels[:size]
+        futures = [
+            [executor.submit(evaluate, params, level, timeout) for level in rung]
+            for params in candidates
+        ]
+        scores = [score([future.result() for future in row]) for row in futures]
+        # The highest solve rate first, then the lowest median time
+        ranking = sorted(
+            range(len(candidates)), key=lambda i: (-scores[i][0], scores[i][1])
+        )
+        print(
+            f"\t{len(candidates)} candidates on {len(rung)} levels,",
+            f"best: {candidates[ranking[0]]}",
+            f"solve rate {scores[ranking[0]][0]:.0%},",
+            f"median {scores[ranking[0]][1] * 1000:.1f} ms",
+        )
+
+        if size >= len(levels):
+            return candidates[ranking[0]], scores[ranking[0]]
+        candidates = [candidates[i] for i in ranking[: max(1, len(candidates) // eta)]]
+        size = min(len(levels), size * eta)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        description="Tune the solver parameters per grid size class"
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        default=os.path.join(config.DATA_DIR, "levels.json"),
+        help="level pack with the training levels",
+    )
+    parser.add_argument(
+        "-l", "--level", type=int, nargs="+", help="training levels of the pack"
+    )
+    parser.add_argument(
+        "-n", "--candidates", type=int, default=27, help="candidates per size class"
+    )
+    parser.add_argument(
+        "-t", "--timeout", type=float, default=2, help="seconds per solve"
+    )
+    parser.add_argument(
+        "--eta", type=int, default=3, help="1/eta candidates kept per round"
+    )
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "-o", "--output", default=config.SOLVER_PROFILE, help="solver profile to write"
+    )
+    args = parser.parse_args(argv[1:])
+
+    try:
+        levels = utils.load_level_pack(args.file)
+    except Exception as e:
+        print(e)
+        sys.exit(1)
+    chosen = args.level or range(1, len(levels) + 1)
+
+    classes = {}
+    for level in chosen:
+        grid_config = levels[level - 1]
+        name = size_class(grid_config["rows"], grid_config["cols"])
+        classes.setdefault(name, []).append(grid_config)
+
+    random.seed(args.seed)
+    default = {
+        "added_cost_factor": config.ADDED_COST_FACTOR,
+        "max_repetitions": config.MAX_REPETITIONS,
+        "window_repetition": config.WINDOW_REPETITION,
+    }
+
+    profile = {"classes": {}}
+    with ProcessPoolExecutor(args.workers) as executor:
+        for name, class_levels in classes.items():
+            # The defaults compete with random candidates
+            candidates = [default]
+            while len(candidates) < args.candidates:
+                params = {
+                    key: random.choice(values) for key, values in SEARCH_SPACE.items()
+                }
+                if params not in candidates:
+                    candidates.append(params)
+            random.shuffle(class_levels)
+
+            print(f"Size class {name}: {len(class_levels)} levels")
+            params, (solve_rate, median_time) = successive_halving(
+                executor, candidates, class_levels, args.timeout, args.eta
+            )
+            profile["classes"][name] = {
+                "params": params,
+                "levels": len(class_levels),
+                "solve_rate": solve_rate,
+                "median_ms": median_time * 1000,
+            }
+
+    with open(args.output, "w") as output:
+        json.dump(profile, output, indent=2)
+    print(f"Wrote the solver profile to {args.output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
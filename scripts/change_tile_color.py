@@ -1,6 +1,17 @@
+# Builds the colored tile sprites from the tiles of the original color, for
+# every color of config.COLORS and of the colorblind palettes, and the tiles
+# atlas the game tints at runtime. A manifest of the content hashes of the
+# sources keeps track of the outputs, so only outdated outputs are rebuilt:
+#
+#   python scripts/change_tile_color.py [--force] [--jobs N]
+import argparse, hashlib, json, os, pathlib, sys
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 from PIL import Image
-import pathlib, os
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+from utils import config
 
 tiles_directory = (
     pathlib.Path(__file__) / ".." / ".." / "assets" / "sprites" / "tiles"
@@ -27,43 +38,204 @@ tile_ext = ".png"
 
 original_color = [
     "white",
-    (255, 255, 255),
+    config.COLORS["white"],
 ]
 
-new_colors = {
-    "silver": (192, 192, 192),
-    "gray": (128, 128, 128),
-    "red": (255, 0, 0),
-    "orange": (255, 165, 0),
-    "moccasin": (255, 228, 181),
-    "green": (0, 128, 0),
-    "lime": (0, 255, 0),
-    "yellow": (255, 255, 0),
-    "purple": (128, 0, 128),
-    "magenta": (255, 0, 255),
-    "navy": (0, 0, 128),
-    "blue": (0, 0, 255),
-    "teal": (0, 128, 128),
-    "cyan": (0, 255, 255),
-    "maroon": (128, 0, 0),
-}
-
-for tile_name in tiles_names:
-    for color_name, color in new_colors.items():
-        tile_file = tile_name + "_" + original_color[0] + tile_ext
-        im = Image.open(tiles_directory / original_color[0] / tile_file)
-        data = np.array(im)
-        r1, g1, b1 = original_color[1]
-        r2, g2, b2 = color
-        red, green, blue = data[:, :, 0], data[:, :, 1], data[:, :, 2]
-        mask = (red == r1) & (green == g1) & (blue == b1)
-        data[:, :, :3][mask] = [r2, g2, b2]
-        im = Image.fromarray(data)
-        new_tile_file = tile_name + "_" + color_name + tile_ext
-
-        if not os.path.exists(tiles_directory / color_name):
-            os.makedirs(tiles_directory / color_name)
-
-        im.save(
-            tiles_directory / color_name / new_tile_file,
-        )
+manifest_file = pathlib.Path(config.CACHE_DIR) / "tiles_manifest.json"
+
+
+def target_colors() -> dict:
+    """Colors to build the tiles of, by output directory. The colors of
+    config.COLORS go to the tiles directory, and the colors a colorblind
+    palette changes go to tiles/palettes/<palette>.
+
+    Returns:
+        dict: {output directory: {color name: color}}
+    """
+
+    targets = {
+        tiles_directory: {
+            name: color
+            for name, color in config.COLORS.items()
+            if name != original_color[0]
+        }
+    }
+    for palette_name, palette in config.PALETTES.items():
+        changed = {
+            name: color
+            for name, color in palette.items()
+            if color != config.COLORS[name]
+        }
+        if changed:
+            targets[tiles_directory / "palettes" / palette_name] = changed
+    return targets
+
+
+def source_file(tile_name: str) -> pathlib.Path:
+    """The tile of the original color the other colors are built from."""
+
+    return (
+        tiles_directory
+        / original_color[0]
+        / (tile_name + "_" + original_color[0] + tile_ext)
+    )
+
+
+def output_file(
+    directory: pathlib.Path, tile_name: str, color_name: str
+) -> pathlib.Path:
+    return directory / color_name / (tile_name + "_" + color_name + tile_ext)
+
+
+def file_hash(file: pathlib.Path) -> str:
+    return hashlib.sha1(file.read_bytes()).hexdigest()
+
+
+def recolor(source: str, outputs: list) -> list:
+    """Builds the outputs of a tile. The source is decoded once and all the
+    colors are recolored at once.
+
+    Args:
+        source (str): path to the tile of the original color
+        outputs (list): (path, color) of every output to build
+
+    Returns:
+        list: paths of the outputs written. Existing outputs with the same
+        pixels are kept as they are
+    """
+
+    data = np.array(Image.open(source))
+    mask = np.all(data[:, :, :3] == original_color[1], axis=2)
+    colors = np.array([color for _, color in outputs], dtype=data.dtype)
+
+    # A copy of the tile per color, with the pixels of the original color
+    # replaced by that color
+    tiles = np.repeat(data[np.newaxis], len(outputs), axis=0)
+    tiles[:, mask, :3] = colors[:, np.newaxis, :]
+
+    written = []
+    for (file, _), tile in zip(outputs, tiles):
+        file = pathlib.Path(file)
+        if file.exists() and np.array_equal(np.array(Image.open(file)), tile):
+            continue
+        file.parent.mkdir(parents=True, exist_ok=True)
+        Image.fromarray(tile).save(file)
+        written.append(str(file))
+    return written
+
+
+def build_atlas() -> None:
+    """Builds the atlas of the tiles the game tints at runtime. The atlas is
+    a row with the tiles of the original color sorted by name (the same
+    order as config.ATLAS_SHAPES) followed by the empty tile."""
+
+    atlas_files = [source_file(tile_name) for tile_name in sorted(tiles_names)] + [
+        tiles_directory / ("tile_empty" + tile_ext)
+    ]
+
+    atlas_tiles = [Image.open(atlas_file).convert("RGB") for atlas_file in atlas_files]
+    tile_width, tile_height = atlas_tiles[0].size
+    atlas = Image.new("RGB", (tile_width * len(atlas_tiles), tile_height))
+    for i, tile in enumerate(atlas_tiles):
+        atlas.paste(tile, (i * tile_width, 0))
+    atlas.save(tiles_directory / config.ATLAS_FILE, optimize=True)
+
+
+def load_manifest() -> dict:
+    try:
+        with open(manifest_file, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: dict) -> None:
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = manifest_file.with_suffix(".tmp")
+    with open(tmp_file, "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(tmp_file, manifest_file)
+
+
+def is_up_to_date(manifest: dict, file: pathlib.Path, entry: dict) -> bool:
+    """Checks that an output was built from the same source and color, and
+    that it wasn't changed since."""
+
+    key = str(file.relative_to(tiles_directory))
+    if manifest.get(key, {}).get("build") != entry:
+        return False
+    try:
+        stat = file.stat()
+    except OSError:
+        return False
+    return manifest[key]["stat"] == [stat.st_size, stat.st_mtime_ns]
+
+
+def record(manifest: dict, file: pathlib.Path, entry: dict) -> None:
+    stat = file.stat()
+    manifest[str(file.relative_to(tiles_directory))] = {
+        "build": entry,
+        "stat": [stat.st_size, stat.st_mtime_ns],
+    }
+
+
+def main(argv) -> None:
+    parser = argparse.ArgumentParser(description="Build the colored tile sprites")
+    parser.add_argument(
+        "--force", action="store_true", help="rebuild outputs that are up to date"
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes")
+    args = parser.parse_args(argv[1:])
+
+    manifest = {} if args.force else load_manifest()
+    targets = target_colors()
+    source_hashes = {
+        tile_name: file_hash(source_file(tile_name)) for tile_name in tiles_names
+    }
+
+    # Outdated outputs, by tile
+    tasks = {}
+    entries = {}
+    total = 0
+    for tile_name in tiles_names:
+        for directory, colors in targets.items():
+            for color_name, color in colors.items():
+                file = output_file(directory, tile_name, color_name)
+                entry = {"source": source_hashes[tile_name], "color": list(color)}
+                entries[file] = entry
+                total += 1
+                if not is_up_to_date(manifest, file, entry):
+                    tasks.setdefault(tile_name, []).append((str(file), color))
+
+    written = 0
+    with ProcessPoolExecutor(args.jobs) as executor:
+        futures = {
+            tile_name: executor.submit(recolor, str(source_file(tile_name)), outputs)
+            for tile_name, outputs in tasks.items()
+        }
+        for tile_name, future in futures.items():
+            written += len(future.result())
+            for file, _ in tasks[tile_name]:
+                record(manifest, pathlib.Path(file), entries[pathlib.Path(file)])
+
+    atlas_file = tiles_directory / config.ATLAS_FILE
+    atlas_entry = {
+        "sources": [source_hashes[tile_name] for tile_name in sorted(tiles_names)]
+        + [file_hash(tiles_directory / ("tile_empty" + tile_ext))]
+    }
+    atlas_built = False
+    if not is_up_to_date(manifest, atlas_file, atlas_entry):
+        build_atlas()
+        record(manifest, atlas_file, atlas_entry)
+        atlas_built = True
+
+    save_manifest(manifest)
+    outdated = sum(len(outputs) for outputs in tasks.values())
+    print(
+        f"{outdated} of {total} tiles outdated,",
+        f"{written} written, atlas {'built' if atlas_built else 'up to date'}",
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -4,6 +4,10 @@ import os
 BASE_DIR = os.path.split(os.path.split(os.path.abspath(__file__))[0])[0]
 DATA_DIR = os.path.join(BASE_DIR, "data")
 ASSETS_DIR = os.path.join(BASE_DIR, "assets")
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+
+# Characters read at a time when streaming a level pack
+STREAM_CHUNK_SIZE = 64 * 1024
 
 # Colors
 COLORS = {
@@ -25,12 +29,32 @@ COLORS = {
     "maroon": (128, 0, 0),
 }
 
+# Color palettes for colorblind players. They keep the names of COLORS
+# but change the colors that are confused with each type of color blindness
+_RED_GREEN_COLORS = {
+    "red": (230, 97, 1),
+    "green": (0, 114, 178),
+    "lime": (178, 171, 210),
+    "maroon": (94, 60, 153),
+}
+PALETTES = {
+    "normal": COLORS,
+    "protanopia": {**COLORS, **_RED_GREEN_COLORS},
+    "deuteranopia": {**COLORS, **_RED_GREEN_COLORS},
+    "tritanopia": {
+        **COLORS,
+        "yellow": (255, 182, 219),
+        "cyan": (182, 109, 255),
+        "blue": (0, 109, 219),
+    },
+}
+
 # Points
 MIN_POINTS = 2
 MAX_POINTS = len(COLORS)
 
 # Grid size
-MAX_GRID_N = 9  # 9x9 is the maximum grid size
+MAX_GRID_N = 30  # 30x30 is the maximum grid size
 
 # Tile states
 TILE_STATES = [
@@ -65,23 +89,87 @@ TILE_STATES = [
 
 # Tiles configuration
 TILE_SIZE = 48
+# Tiles are scaled down to fit large grids in the window, but not
+# smaller than this size so they can still be played (see BoardLayout)
+MIN_TILE_SIZE = 16
+
+# The tiles atlas is a row with a tile of every shape in ATLAS_COLOR, which
+# is tinted with the colors at runtime, followed by the empty tile. The shape
+# of a tile state is its sorted pair of positions
+ATLAS_FILE = "tiles_atlas.png"
+ATLAS_COLOR = (255, 255, 255)
+ATLAS_SHAPES = [
+    (0, 0),
+    (0, 1),
+    (0, 2),
+    (0, 3),
+    (0, 4),
+    (1, 2),
+    (1, 3),
+    (1, 4),
+    (1, 5),
+    (2, 3),
+    (2, 4),
+    (2, 5),
+    (3, 4),
+    (3, 5),
+    (4, 5),
+]
 
 # Fonts configuration
 FONT_SIZE = 20
 FONT_FAMILY = "Roboto-Regular.ttf"
+# Maximum number of rendered texts kept in memory
+TEXT_CACHE_SIZE = 64
 
 # Display configuration
 MARGIN = 16
-WIDTH = TILE_SIZE * MAX_GRID_N + MARGIN * 2
-HEIGHT = TILE_SIZE * MAX_GRID_N + MARGIN * 3 + FONT_SIZE
+# The board area fits a 9x9 grid at TILE_SIZE, which sets the
+# default window size. Larger grids are drawn with smaller tiles
+BOARD_SIZE = TILE_SIZE * 9
+WIDTH = BOARD_SIZE + MARGIN * 2
+HEIGHT = BOARD_SIZE + MARGIN * 3 + FONT_SIZE
+# If a grid doesn't fit the board area at MIN_TILE_SIZE, the window
+# grows up to this size (and the desktop size). Beyond it the board
+# scrolls with the mouse wheel
+MAX_WIDTH = 1280
+MAX_HEIGHT = 960
 
 TITLE = "Flow"
 FPS = 60
 
+# Number of frames whose draw times are kept by the frame profiler
+PROFILER_FRAMES = 600
+
+# Milliseconds between the refreshes of the frame profiler overlay
+PROFILER_REFRESH = 1000
+
+# While the game is idle (no path is being drawn), the game loop waits
+# for input instead of ticking at FPS. The wait is limited to
+# IDLE_TIMEOUT milliseconds
+IDLE_WAIT = True
+IDLE_TIMEOUT = 1000
+
+# Level browser of the level selection screen: thumbnails per page,
+# size of a thumbnail in pixels and maximum number of thumbnails kept
+# in memory
+BROWSER_COLS = 5
+BROWSER_ROWS = 3
+THUMBNAIL_SIZE = 96
+THUMBNAIL_CACHE_SIZE = 120
+
 # SOLVER
 
 # Solver configuration
 
+# The defaults below are hand-picked, not tuned. No solver profile is
+# shipped, so every size class uses them until run_tuning_experiment.py
+# writes one to SOLVER_PROFILE.
+
+# The added cost of a tried path, relative to the number of cells
+# of the grid. It encourages the solver to try different paths.
+ADDED_COST_FACTOR = 1
+
 # The maximum number of repetitions tells the solver how many
 # times it can find repeated paths.
 MAX_REPETITIONS = 500
@@ -89,3 +177,30 @@ MAX_REPETITIONS = 500
 # The sliding window repetition tells the solver how many times
 # the found paths can be repeated in the sequence.
 WINDOW_REPETITION = 3
+
+# The maximum number of tried paths the solver remembers per point-pair.
+# When it is reached, the least recently tried paths are forgotten, so
+# the memory of a solve is bounded. Forgotten paths can be tried again,
+# so it must be well above the tried paths of a search (see cli.py bench).
+MAX_TRIED_PATHS = 1024
+
+# The solver parameters can be tuned per size class of the grids (see
+# run_tuning_experiment.py). A class has the grids whose largest side is
+# up to its value. The tuned parameters are loaded from SOLVER_PROFILE,
+# the grids of classes without tuned parameters use the defaults above.
+SOLVER_SIZE_CLASSES = {"small": 6, "medium": 9, "large": 30}
+SOLVER_PROFILE = os.path.join(DATA_DIR, "solver_profile.json")
+
+# Seconds the solver can take to find the solution of a hint
+HINT_TIMEOUT = 5
+# Maximum number of hint solutions kept per level, by the player's paths
+# they keep. The least recently used are evicted
+HINT_CACHE_SIZE = 64
+
+# Solver service configuration
+
+# Seconds a solve request can take, unless the request has its own timeout
+SERVICE_TIMEOUT = 10
+
+# Number of requests whose latency is kept for the latency percentiles
+SERVICE_LATENCY_WINDOW = 1000
@@ -0,0 +1,229 @@
+import glob, os
+import pygame as pg
+
+from . import config
+
+
+def load_image(file: str, scale: tuple[int, int] = None) -> pg.Surface:
+    """Loads an image from the assets directory and returns it as a Surface object
+
+    Args:
+        file (str): path to the image file
+        scale (tuple[int, int], optional): scaling in (width px, heigh px)
+        to be done to the image. Defaults to None.
+
+    Raises:
+        SystemExit: if the image file is not found or cannot be loaded
+
+    Returns:
+        pg.Surface: the image as a Surface object
+    """
+
+    try:
+        surface = pg.image.load(file)
+    except (pg.error, FileNotFoundError) as message:
+        print("Cannot load image:", file)
+        raise SystemExit(message)
+    if scale:
+        surface = pg.transform.scale(surface, scale)
+    return surface.convert()
+
+
+def load_cached_images(file: str, quantity: int, size: tuple[int, int]) -> list:
+    """Loads already scaled images from a raw RGB pixel buffers cache file.
+
+    Args:
+        file (str): path to the cache file
+        quantity (int): number of images in the cache file
+        size (tuple[int, int]): size in (width px, height px) of every image
+
+    Returns:
+        list: the images as Surface objects, or None if the cache file
+        doesn't exist or doesn't match the images
+    """
+
+    try:
+        with open(file, "rb") as cache:
+            data = cache.read()
+    except OSError:
+        return None
+
+    length = size[0] * size[1] * 3
+    if len(data) != length * quantity:
+        return None
+    return [
+        pg.image.fromstring(data[i * length : (i + 1) * length], size, "RGB").convert()
+        for i in range(quantity)
+    ]
+
+
+def save_cached_images(file: str, surfaces: list) -> None:
+    """Saves images as raw RGB pixel buffers to a cache file. Failing to
+    write the cache is not an error, the images will just be loaded again.
+
+    Args:
+        file (str): path to the cache file
+        surfaces (list): the images as Surface objects
+    """
+
+    try:
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        with open(file + ".tmp", "wb") as cache:
+            for surface in surfaces:
+                cache.write(pg.image.tostring(surface, "RGB"))
+        os.replace(file + ".tmp", file)
+    except OSError as message:
+        print("Cannot write cache:", message)
+
+
+def remove_stale_caches(pattern: str, current: str) -> None:
+    """Removes the cache files of an older version of a source file, e.g.
+    the ones keyed by an older modification time. Failing to remove a
+    cache file is not an error.
+
+    Args:
+        pattern (str): glob pattern of the cache files of every version
+        current (str): the part of a cache file name of the current version
+    """
+
+    for file in glob.glob(pattern):
+        if current not in os.path.basename(file):
+            try:
+                os.remove(file)
+            except OSError:
+                pass
+
+
+def load_atlas(tile_size: int = config.TILE_SIZE) -> pg.Surface:
+    """Loads the tiles atlas scaled to the tile size. The scaled atlas is
+    cached in the cache directory, keyed by the tile size and the atlas
+    modification time, so the next loads skip decoding and scaling it. The
+    cached atlases of older atlas files are removed.
+
+    Args:
+        tile_size (int, optional): side of a tile in px. Defaults to TILE_SIZE.
+
+    Returns:
+        pg.Surface: the tiles atlas (see ATLAS_FILE)
+    """
+
+    file = os.path.join(config.ASSETS_DIR, "sprites", "tiles", config.ATLAS_FILE)
+    size = (tile_size * (len(config.ATLAS_SHAPES) + 1), tile_size)
+
+    try:
+        mtime = os.stat(file).st_mtime_ns
+    except OSError:
+        mtime = 0
+    cache_file = os.path.join(
+        config.CACHE_DIR, "tiles", f"atlas_{tile_size}_{mtime}.rgb"
+    )
+
+    surfaces = load_cached_images(cache_file, 1, size)
+    if surfaces is None:
+        surfaces = [load_image(file, size)]
+        save_cached_images(cache_file, surfaces)
+        # The scaled atlases of an older atlas are never loaded again
+        remove_stale_caches(
+            os.path.join(config.CACHE_DIR, "tiles", "atlas_*.rgb"), f"_{mtime}."
+        )
+    return surfaces[0]
+
+
+def tint_atlas(atlas: pg.Surface, color: tuple[int, int, int]) -> pg.Surface:
+    """Creates a copy of the tile shapes of the atlas in the given color.
+    Every pixel in ATLAS_COLOR is replaced by the color at once. The tile
+    size is the height of the atlas.
+
+    Args:
+        atlas (pg.Surface): the tiles atlas
+        color (tuple[int, int, int]): the color of the tiles
+
+    Returns:
+        pg.Surface: the tinted tile shapes, in the same order as the atlas
+    """
+
+    tile_size = atlas.get_height()
+    tinted = atlas.subsurface(
+        (0, 0, tile_size * len(config.ATLAS_SHAPES), tile_size)
+    ).copy()
+    pixels = pg.surfarray.pixels3d(tinted)
+    pixels[(pixels == config.ATLAS_COLOR).all(axis=2)] = color
+    # Release the pixels lock of the surface
+    del pixels
+    return tinted
+
+
+def atlas_tiles(tinted: pg.Surface) -> dict:
+    """Splits the tile shapes of an atlas into the sprite of every tile state.
+
+    Args:
+        tinted (pg.Surface): the tile shapes (see tint_atlas)
+
+    Returns:
+        dict: sprite of every tile state, as a subsurface of the atlas
+    """
+
+    tile_size = tinted.get_height()
+    shapes = {shape: i for i, shape in enumerate(config.ATLAS_SHAPES)}
+    return {
+        state: tinted.subsurface(
+            (
+                shapes[tuple(sorted(state))] * tile_size,
+                0,
+                tile_size,
+                tile_size,
+            )
+        )
+        for state in config.TILE_STATES
+    }
+
+
+class LazyTiles(dict):
+    """Tile sprites divided by color, where the sprites of a color are
+    tinted from the atlas the first time the color is used."""
+
+    def __init__(self, atlas: pg.Surface, palette: dict) -> None:
+        """
+        Args:
+            atlas (pg.Surface): the tiles atlas (see load_atlas)
+            palette (dict): the colors by color name
+        """
+
+        super().__init__()
+        self.atlas = atlas
+        self.palette = palette
+
+    def __missing__(self, color: str) -> dict:
+        if color == "empty":
+            tile_size = self.atlas.get_height()
+            self[color] = {
+                (0, 0): self.atlas.subsurface(
+                    (
+                        tile_size * len(config.ATLAS_SHAPES),
+                        0,
+                        tile_size,
+                        tile_size,
+                    )
+                )
+            }
+        else:
+            self[color] = atlas_tiles(tint_atlas(self.atlas, self.palette[color]))
+        return self[color]
+
+
+def load_tiles(
+    palette: dict = config.COLORS, tile_size: int = config.TILE_SIZE
+) -> LazyTiles:
+    """Load tiles sprites from the tiles atlas. The sprites of each color
+    are tinted on first use, so only the colors in play are created.
+
+    Args:
+        palette (dict, optional): the colors by color name. Defaults to COLORS.
+        tile_size (int, optional): side of a tile in px. Defaults to TILE_SIZE.
+
+    Returns:
+        LazyTiles: Tile sprites divided by color. Every color has a state
+        for each tile type.
+    """
+
+    return LazyTiles(load_atlas(tile_size), palette)
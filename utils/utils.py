@@ -1,70 +1,10 @@
-import os, random, json
-import pygame as pg
+import os, random, json, re, mmap, hashlib, struct
+from array import array
+from collections import OrderedDict
 
 from . import config
 
 
-def load_image(file: str, scale: tuple[int, int] = None) -> pg.Surface:
-    """Loads an image from the assets directory and returns it as a Surface object
-
-    Args:
-        file (str): path to the image file
-        scale (tuple[int, int], optional): scaling in (width px, heigh px)
-        to be done to the image. Defaults to None.
-
-    Raises:
-        SystemExit: if the image file is not found or cannot be loaded
-
-    Returns:
-        pg.Surface: the image as a Surface object
-    """
-
-    try:
-        surface = pg.image.load(file)
-    except (pg.error, FileNotFoundError) as message:
-        print("Cannot load image:", file)
-        raise SystemExit(message)
-    if scale:
-        surface = pg.transform.scale(surface, scale)
-    return surface.convert()
-
-
-def load_tiles():
-    """Load tiles sprites from assets directory.
-
-    Returns:
-        dict: Tile sprites divided by color. Every color has a state
-        for each tile type.
-    """
-
-    tiles = {}
-    for color in config.COLORS:
-        tiles[color] = {}
-        for state in config.TILE_STATES:
-            s1 = min(state[0], state[1])
-            s2 = max(state[0], state[1])
-
-            tiles[color][state] = load_image(
-                os.path.join(
-                    config.ASSETS_DIR,
-                    "sprites",
-                    "tiles",
-                    color,
-                    f"tile_{s1}{s2}_{color}.png",
-                ),
-                (config.TILE_SIZE, config.TILE_SIZE),
-            )
-    # Empty tile
-    tiles["empty"] = {
-        (0, 0): load_image(
-            os.path.join(config.ASSETS_DIR, "sprites", "tiles", "tile_empty.png"),
-            (config.TILE_SIZE, config.TILE_SIZE),
-        )
-    }
-
-    return tiles
-
-
 def randomize_colors(quantity: int) -> list:
     """Chooses a random subset of colors from the COLORS names.
     Adds an "empty" color as the first element of the subset.
@@ -109,12 +49,653 @@ def load_grid_config(file: str) -> list | dict:
 
     if isinstance(data, list):
         for config in data:
+            validate_grid_config(config)
             points = [[tuple(point) for point in pair] for pair in config["points"]]
             config["points"] = points
         return data
     elif isinstance(data, dict):
+        validate_grid_config(data)
         points = [[tuple(point) for point in pair] for pair in data["points"]]
         data["points"] = points
         return data
     else:
         raise Exception("Invalid JSON file")
+
+
+def validate_grid_config(data: dict) -> None:
+    """Checks that a grid configuration can create a grid. That is, it has
+    the keys of the Grid constructor with valid sizes, and its points are
+    all different cells inside the grid.
+
+    Args:
+        data (dict): grid configuration
+
+    Raises:
+        Exception: if the grid configuration is invalid
+    """
+
+    if not isinstance(data, dict):
+        raise Exception("Invalid grid configuration: not an object")
+    for key in ("rows", "cols", "qpoints", "points"):
+        if key not in data:
+            raise Exception(f"Invalid grid configuration: missing {key}")
+
+    rows, cols, qpoints, points = (
+        data["rows"],
+        data["cols"],
+        data["qpoints"],
+        data["points"],
+    )
+    if not all(isinstance(value, int) for value in (rows, cols, qpoints)):
+        raise Exception(
+            "Invalid grid configuration: rows, cols and qpoints must be integers"
+        )
+    if not (2 <= rows <= config.MAX_GRID_N and 2 <= cols <= config.MAX_GRID_N):
+        raise Exception(
+            f"Invalid grid configuration: rows and cols must be between 2 and {config.MAX_GRID_N}"
+        )
+    if not config.MIN_POINTS <= qpoints <= config.MAX_POINTS:
+        raise Exception(
+            f"Invalid grid configuration: qpoints must be between {config.MIN_POINTS} and {config.MAX_POINTS}"
+        )
+    if not isinstance(points, list) or len(points) != qpoints:
+        raise Exception(
+            "Invalid grid configuration: len(points) must be equal to qpoints"
+        )
+
+    cells = set()
+    for pair in points:
+        if not isinstance(pair, (list, tuple)) or len(pair) != 2:
+            raise Exception("Invalid grid configuration: points must be pairs")
+        for point in pair:
+            if (
+                not isinstance(point, (list, tuple))
+                or len(point) != 2
+                or not all(isinstance(value, int) for value in point)
+            ):
+                raise Exception("Invalid grid configuration: points must be (row, col)")
+            row, col = point
+            if not (0 <= row < rows and 0 <= col < cols):
+                raise Exception(
+                    f"Invalid grid configuration: point {point} is outside the grid"
+                )
+            if (row, col) in cells:
+                raise Exception(
+                    f"Invalid grid configuration: point {point} is repeated"
+                )
+            cells.add((row, col))
+
+
+def iter_grid_configs(file: str, chunk_size: int = config.STREAM_CHUNK_SIZE):
+    """Loads the grid configurations of a file one at a time, reading the
+    file in chunks, so the memory used doesn't grow with the file size. The
+    file can be a JSON array of grid configurations (see load_grid_config),
+    a single grid configuration or JSON-lines, a configuration per line.
+
+    Args:
+        file (str): path to the JSON or JSON-lines file
+        chunk_size (int, optional): characters read at a time.
+        Defaults to STREAM_CHUNK_SIZE.
+
+    Raises:
+        Exception: if the file is not found, cannot be loaded or a grid
+        configuration is invalid
+
+    Yields:
+        dict: the next grid configuration
+    """
+
+    try:
+        stream = open(file, "r")
+    except FileNotFoundError as message:
+        print("Cannot load:", file)
+        raise Exception(message)
+
+    decoder = json.JSONDecoder()
+    whitespace = re.compile(r"\s*")
+    buffer, pos, eof = "", 0, False
+    # Inside an array, what can come next: the first configuration or the
+    # end of the array, a configuration after a comma, or a comma or the end
+    # of the array after a configuration
+    in_array, expect, closed = None, "first", False
+    with stream:
+        while True:
+            pos = whitespace.match(buffer, pos).end()
+            if pos == len(buffer):
+                if eof:
+                    break
+                chunk = stream.read(chunk_size)
+                buffer, pos, eof = chunk, 0, not chunk
+                continue
+
+            char = buffer[pos]
+            if closed:
+                raise Exception("Invalid JSON file")
+            if in_array is None:
+                in_array = char == "["
+                if in_array:
+                    pos += 1
+                    continue
+            if in_array and expect == "separator":
+                if char not in ",]":
+                    raise Exception("Invalid JSON file")
+                closed = char == "]"
+                expect = "value"
+                pos += 1
+                continue
+            if in_array and expect == "first" and char == "]":
+                closed = True
+                pos += 1
+                continue
+            if char != "{":
+                raise Exception("Invalid JSON file")
+
+            try:
+                data, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof or _object_end(buffer, pos) is not None:
+                    raise Exception("Invalid JSON file")
+                # The configuration continues in the next chunk. Read at
+                # least as much as is buffered, so long configurations
+                # aren't decoded again for every chunk
+                chunk = stream.read(max(chunk_size, len(buffer) - pos))
+                buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+                continue
+
+            validate_grid_config(data)
+            data["points"] = [
+                [tuple(point) for point in pair] for pair in data["points"]
+            ]
+            expect = "separator"
+            yield data
+
+    if in_array and not closed:
+        raise Exception("Invalid JSON file")
+
+
+# Strings and braces of a JSON document, to find where the objects are
+# without parsing them. Braces inside strings are skipped with the strings
+_JSON_TOKENS = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}]')
+_JSON_TEXT_TOKENS = re.compile(_JSON_TOKENS.pattern.decode())
+
+
+def _object_end(text: str, pos: int) -> int | None:
+    """Finds where the JSON object that starts at pos ends, without parsing it.
+
+    Returns:
+        int | None: the position after the object, or None if it doesn't end
+        in the text
+    """
+
+    depth = 0
+    for match in _JSON_TEXT_TOKENS.finditer(text, pos):
+        char = match.group()
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return None
+
+
+def index_json_array(data) -> array:
+    """Finds the byte offsets of the objects of a JSON array without parsing
+    them. If the JSON document is an object, it is the only object.
+
+    Args:
+        data (bytes | mmap.mmap): the JSON document
+
+    Returns:
+        array: flattened (start, end) byte offsets of every object
+    """
+
+    if re.match(rb"\s*[\[{]", data) is None:
+        raise Exception("Invalid JSON file")
+
+    offsets = array("Q")
+    depth, start = 0, 0
+    for match in _JSON_TOKENS.finditer(data):
+        char = data[match.start() : match.start() + 1]
+        if char == b"{":
+            depth += 1
+            if depth == 1:
+                start = match.start()
+        elif char == b"}":
+            if depth == 1:
+                offsets.extend((start, match.end()))
+            depth -= 1
+    return offsets
+
+
+def _valid_offsets(data, offsets: array) -> bool:
+    """Checks that the offsets of an index (see index_json_array) can be the
+    objects of a JSON document: (start, end) pairs in order, inside the
+    document, that start and end with braces.
+
+    Args:
+        data (bytes | mmap.mmap): the JSON document
+        offsets (array): flattened (start, end) byte offsets
+
+    Returns:
+        bool: True if the offsets are valid, False otherwise
+    """
+
+    if len(offsets) % 2 != 0:
+        return False
+    previous = 0
+    for i in range(0, len(offsets), 2):
+        start, end = offsets[i], offsets[i + 1]
+        if not previous <= start < end <= len(data):
+            return False
+        if data[start : start + 1] != b"{" or data[end - 1 : end] != b"}":
+            return False
+        previous = end
+    return True
+
+
+class LevelPack:
+    """Levels of a grid configuration JSON file (see load_grid_config). The
+    file is indexed once by the byte offsets of every level, so a level is
+    only parsed when it is loaded. The index is kept in a sidecar file in the
+    cache directory, so the next processes don't have to index the file."""
+
+    def __init__(self, file: str) -> None:
+        """
+        Args:
+            file (str): path to the JSON file
+
+        Raises:
+            Exception: if the file is not found or cannot be loaded
+        """
+
+        try:
+            with open(file, "rb") as pack:
+                stat = os.fstat(pack.fileno())
+                self._data = (
+                    mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ)
+                    if stat.st_size > 0
+                    else b""
+                )
+        except FileNotFoundError as message:
+            print("Cannot load:", file)
+            raise Exception(message)
+
+        self.file = file
+        self.mtime = stat.st_mtime_ns
+        self.size = stat.st_size
+
+        key = hashlib.sha1(os.path.abspath(file).encode()).hexdigest()[:16]
+        index_file = os.path.join(
+            config.CACHE_DIR, "levels", f"{key}_{self.mtime}_{self.size}.idx"
+        )
+        self._offsets = array("Q")
+        try:
+            with open(index_file, "rb") as index:
+                self._offsets.frombytes(index.read())
+            if not _valid_offsets(self._data, self._offsets):
+                raise ValueError("Invalid index")
+        except (OSError, ValueError):
+            self._offsets = index_json_array(self._data)
+            try:
+                os.makedirs(os.path.dirname(index_file), exist_ok=True)
+                with open(index_file, "wb") as index:
+                    self._offsets.tofile(index)
+            except OSError as message:
+                print("Cannot write cache:", message)
+
+    def __len__(self) -> int:
+        return len(self._offsets) // 2
+
+    def __getitem__(self, index: int) -> dict:
+        """Loads a level.
+
+        Args:
+            index (int): index of the level
+
+        Raises:
+            Exception: if the level is not a valid grid configuration
+
+        Returns:
+            dict: the grid configuration of the level
+        """
+
+        if not -len(self) <= index < len(self):
+            raise IndexError("level index out of range")
+        index %= len(self)
+        start, end = self._offsets[index * 2], self._offsets[index * 2 + 1]
+        data = json.loads(self._data[start:end])
+        validate_grid_config(data)
+        data["points"] = [[tuple(point) for point in pair] for pair in data["points"]]
+        return data
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+# Binary level file layout: header and a fixed-width record per level.
+# A record has the size of the grid, the points as cell ids (row * cols +
+# col) and, if the file has solutions, the directions of the paths
+LEVEL_MAGIC = b"FLWL"
+LEVEL_VERSION = 1
+# magic, version, levels, max rows, max cols, max qpoints, has solutions
+LEVEL_HEADER = struct.Struct("<4sBIBBB?")
+# rows, cols, qpoints, solved
+LEVEL_RECORD = struct.Struct("<BBBB")
+
+# Cell offsets of the 2-bit directions of a solution (up, right, down, left),
+# the directions 1 to 4 of the grid minus one
+_STEPS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+
+def _level_record(max_rows: int, max_cols: int, max_qpoints: int, solutions: bool):
+    """Creates the struct of the records of a binary level file.
+
+    Returns:
+        tuple[struct.Struct, int]: record struct and bytes of its solution
+    """
+
+    # A solution has at most a direction per cell, 4 directions per byte
+    solution_size = (max_rows * max_cols + 3) // 4 if solutions else 0
+    record = struct.Struct(f"{LEVEL_RECORD.format}{max_qpoints * 2}H{solution_size}s")
+    return record, solution_size
+
+
+def pack_solution(points: list, paths: list) -> bytes:
+    """Encodes the paths of a solution as 2-bit directions. The path of every
+    point-pair goes from its first point to its second point, so only the
+    directions are stored, one after the other.
+
+    Args:
+        points (list): point-pairs of the grid
+        paths (list): path of every point-pair, starting at either point
+
+    Raises:
+        Exception: if a path doesn't connect its point-pair
+
+    Returns:
+        bytes: the directions, 4 per byte starting at the low bits
+    """
+
+    bits, count = 0, 0
+    for (start, end), path in zip(points, paths):
+        path = [tuple(cell) for cell in path]
+        if path and path[0] == tuple(end):
+            path.reverse()
+        if not path or path[0] != tuple(start) or path[-1] != tuple(end):
+            raise Exception("Invalid solution: a path doesn't connect its points")
+        for (row1, col1), (row2, col2) in zip(path, path[1:]):
+            bits |= _STEPS.index((row2 - row1, col2 - col1)) << (count * 2)
+            count += 1
+    return bits.to_bytes((count + 3) // 4, "little")
+
+
+def unpack_solution(points: list, data: bytes, cells: int) -> list:
+    """Decodes the paths of a solution encoded by pack_solution.
+
+    Args:
+        points (list): point-pairs of the grid
+        data (bytes): the encoded directions
+        cells (int): number of cells of the grid, the longest a path can be
+
+    Raises:
+        Exception: if the directions don't connect a point-pair
+
+    Returns:
+        list: path of every point-pair, from its first to its second point
+    """
+
+    bits = int.from_bytes(data, "little")
+    paths = []
+    for start, end in points:
+        row, col = start
+        path = [(row, col)]
+        while (row, col) != tuple(end):
+            if len(path) > cells:
+                raise Exception("Invalid solution: a path doesn't connect its points")
+            step_row, step_col = _STEPS[bits & 3]
+            bits >>= 2
+            row, col = row + step_row, col + step_col
+            path.append((row, col))
+        paths.append(path)
+    return paths
+
+
+def level_file_shape(grid_configs) -> tuple[int, int, int]:
+    """Finds the shape of the records of a binary level file for some grid
+    configurations (see save_level_file). The configurations are read one
+    at a time, so they can be streamed (see iter_grid_configs).
+
+    Args:
+        grid_configs (iterable): the grid configurations
+
+    Returns:
+        tuple[int, int, int]: max rows, max cols and max qpoints
+    """
+
+    shape = [0, 0, 0]
+    for data in grid_configs:
+        for i, key in enumerate(("rows", "cols", "qpoints")):
+            shape[i] = max(shape[i], data[key])
+    return tuple(shape)
+
+
+def save_level_file(file: str, grid_configs, shape: tuple, solutions: bool) -> int:
+    """Writes grid configurations to a binary level file. A configuration with
+    "paths" (e.g. from Grid._paths, without the empty color) is written with
+    its solution. The configurations are written as they come, so they can be
+    streamed (see iter_grid_configs).
+
+    Args:
+        file (str): path to the binary level file
+        grid_configs (iterable): the grid configurations
+        shape (tuple): (max rows, max cols, max qpoints) of the
+        configurations, so their records have a fixed width (see
+        level_file_shape)
+        solutions (bool): if the records have room for solutions
+
+    Raises:
+        Exception: if a configuration is larger than the shape or its
+        solution is invalid
+
+    Returns:
+        int: number of configurations written
+    """
+
+    max_rows, max_cols, max_qpoints = shape
+    record, _ = _level_record(max_rows, max_cols, max_qpoints, solutions)
+
+    count = 0
+    tmp_file = file + ".tmp"
+    with open(tmp_file, "wb") as level_file:
+        # The number of levels is written once they are all written
+        level_file.write(
+            LEVEL_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, 0, *shape, solutions)
+        )
+        for data in grid_configs:
+            rows, cols, qpoints = data["rows"], data["cols"], data["qpoints"]
+            if rows > max_rows or cols > max_cols or qpoints > max_qpoints:
+                raise Exception(f"Grid configuration larger than {shape}")
+
+            cells = [row * cols + col for pair in data["points"] for row, col in pair]
+            cells += [0] * (max_qpoints * 2 - len(cells))
+            paths = data.get("paths") if solutions else None
+            solution = pack_solution(data["points"], paths) if paths else b""
+            level_file.write(
+                record.pack(rows, cols, qpoints, bool(paths), *cells, solution)
+            )
+            count += 1
+
+        level_file.seek(0)
+        level_file.write(
+            LEVEL_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, count, *shape, solutions)
+        )
+    os.replace(tmp_file, file)
+    return count
+
+
+def is_level_file(file: str) -> bool:
+    """Checks if a file is a binary level file (see save_level_file)."""
+
+    try:
+        with open(file, "rb") as level_file:
+            return level_file.read(len(LEVEL_MAGIC)) == LEVEL_MAGIC
+    except OSError:
+        return False
+
+
+class LevelFile:
+    """Levels of a binary level file (see save_level_file). The file is
+    mapped to memory and its records have a fixed width, so a level is only
+    read, without parsing, when it is loaded."""
+
+    def __init__(self, file: str) -> None:
+        """
+        Args:
+            file (str): path to the binary level file
+
+        Raises:
+            Exception: if the file is not found or is not a level file
+        """
+
+        try:
+            with open(file, "rb") as level_file:
+                stat = os.fstat(level_file.fileno())
+                if stat.st_size < LEVEL_HEADER.size:
+                    raise Exception("Invalid level file")
+                self._data = mmap.mmap(level_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError as message:
+            print("Cannot load:", file)
+            raise Exception(message)
+
+        magic, version, self._count, *shape, solutions = LEVEL_HEADER.unpack_from(
+            self._data
+        )
+        if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+            raise Exception("Invalid level file")
+        self._record, _ = _level_record(*shape, solutions)
+        if LEVEL_HEADER.size + self._count * self._record.size > stat.st_size:
+            raise Exception("Invalid level file")
+
+        self.file = file
+        self.mtime = stat.st_mtime_ns
+        self.size = stat.st_size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> dict:
+        """Loads a level.
+
+        Args:
+            index (int): index of the level
+
+        Raises:
+            Exception: if the level is not a valid grid configuration
+
+        Returns:
+            dict: the grid configuration of the level, with the "paths" of
+            its solution if it has one
+        """
+
+        if not -len(self) <= index < len(self):
+            raise IndexError("level index out of range")
+        index %= len(self)
+        rows, cols, qpoints, solved, *cells = self._record.unpack_from(
+            self._data, LEVEL_HEADER.size + index * self._record.size
+        )
+        solution = cells.pop()
+        if cols == 0:
+            raise Exception("Invalid grid configuration: missing cols")
+
+        points = [
+            [divmod(cells[i * 2], cols), divmod(cells[i * 2 + 1], cols)]
+            for i in range(qpoints)
+        ]
+        data = {"rows": rows, "cols": cols, "qpoints": qpoints, "points": points}
+        validate_grid_config(data)
+        if solved:
+            data["paths"] = unpack_solution(points, solution, rows * cols)
+        return data
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+_level_packs = {}
+
+
+def load_level_pack(file: str) -> LevelPack | LevelFile:
+    """Loads the levels of a grid configuration JSON file or a binary level
+    file. The level pack of a file is created once per process, unless the
+    file changes.
+
+    Args:
+        file (str): path to the JSON or binary level file
+
+    Raises:
+        Exception: if the file is not found or cannot be loaded
+
+    Returns:
+        LevelPack | LevelFile: the levels of the file
+    """
+
+    path = os.path.abspath(file)
+    pack = _level_packs.get(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        stat = None
+    if (
+        pack is None
+        or stat is None
+        or (pack.mtime, pack.size) != (stat.st_mtime_ns, stat.st_size)
+    ):
+        pack = LevelFile(file) if is_level_file(file) else LevelPack(file)
+        _level_packs[path] = pack
+    return pack
+
+
+class TextCache:
+    """Bounded cache of rendered texts. Rendering text rasterizes its glyphs,
+    so texts that are drawn again (e.g. a HUD value) are rendered only once.
+    When the cache is full, the least recently used text is evicted."""
+
+    def __init__(self, render, max_size: int = config.TEXT_CACHE_SIZE) -> None:
+        """
+        Args:
+            render (callable): function that renders a (text, color) pair
+            max_size (int, optional): maximum number of rendered texts.
+            Defaults to TEXT_CACHE_SIZE.
+        """
+
+        self.render = render
+        self.max_size = max_size
+        self._cache = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, text: str, color: tuple[int, int, int]):
+        """Returns the rendered text, rendering it only if it isn't cached.
+
+        Args:
+            text (str): the text to render
+            color (tuple[int, int, int]): the color of the text
+
+        Returns:
+            the result of the render function for the text
+        """
+
+        key = (text, color)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        rendered = self.render(text, color)
+        self._cache[key] = rendered
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return rendered